@@ -0,0 +1,324 @@
+"""Backend benchmarks.
+
+    python benchmark.py owners [--owners 10000] [--samples 200]
+    python benchmark.py logging [--records 20000] [--sink-latency-us 100]
+    python benchmark.py memory [--owners 1000]
+
+Benchmarks that need MongoDB run against BENCH_DB_NAME (default
+"<DB_NAME>_bench") and drop it first, so they never touch served data.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent / '.env')
+os.environ['DB_NAME'] = os.environ.get('BENCH_DB_NAME', f"{os.environ.get('DB_NAME', 'portfolio')}_bench")
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[max(0, int(round(pct / 100 * len(values))) - 1)]
+
+
+def plan_stages(plan):
+    """Flatten the stage names of an explain() winning plan"""
+    stages = [plan.get("stage")]
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child:
+            stages.extend(plan_stages(child))
+    return stages
+
+
+async def explain_owner_query(collection, owner, sort):
+    cursor = collection.find({"owner": owner})
+    cursor = cursor.sort(sort).limit(100) if sort else cursor.limit(1)
+    explain = await cursor.explain()
+    winning = explain["queryPlanner"]["winningPlan"]
+    stages = plan_stages(winning.get("queryPlan", winning))
+    stats = explain["executionStats"]
+    return {
+        "stages": stages,
+        "keys_examined": stats["totalKeysExamined"],
+        "docs_examined": stats["totalDocsExamined"],
+        "returned": stats["nReturned"],
+    }
+
+
+async def insert_owners(start, stop):
+    """Insert the seed portfolio for owners start..stop-1"""
+    from database import (
+        profiles_collection, projects_collection, skills_collection,
+        achievements_collection, certifications_collection
+    )
+    from models import Profile, Project, SkillCategory, Achievement, Certification
+    from seed_data import MOCK_DATA
+
+    batches = {
+        profiles_collection: [], projects_collection: [], skills_collection: [],
+        achievements_collection: [], certifications_collection: [],
+    }
+    for i in range(start, stop):
+        owner = f"owner-{i:05d}"
+        batches[profiles_collection].append(Profile(**MOCK_DATA["profile"], owner=owner).dict())
+        batches[projects_collection] += [Project(**p, owner=owner).dict() for p in MOCK_DATA["projects"]]
+        batches[skills_collection] += [SkillCategory(**s, owner=owner).dict() for s in MOCK_DATA["skills"]]
+        batches[achievements_collection] += [Achievement(**a, owner=owner).dict() for a in MOCK_DATA["achievements"]]
+        batches[certifications_collection] += [Certification(**c, owner=owner).dict() for c in MOCK_DATA["certifications"]]
+
+    for collection, documents in batches.items():
+        for offset in range(0, len(documents), 5000):
+            await collection.insert_many(documents[offset:offset + 5000], ordered=False)
+
+
+async def bench_owners(args):
+    """Per-owner read latency and query plans as the number of owners grows"""
+    from database import (
+        client, db, init_database, profiles_collection, projects_collection, skills_collection,
+        achievements_collection, certifications_collection
+    )
+    import portfolio_routes
+    from fastapi import Response
+
+    routes = [
+        ("profile", portfolio_routes.get_profile, profiles_collection, None),
+        ("projects", portfolio_routes.get_projects, projects_collection, [("created_at", -1)]),
+        ("skills", portfolio_routes.get_skills, skills_collection, [("category", 1)]),
+        ("achievements", portfolio_routes.get_achievements, achievements_collection, [("created_at", -1)]),
+        ("certifications", portfolio_routes.get_certifications, certifications_collection, [("created_at", -1)]),
+    ]
+
+    await client.drop_database(db.name)
+    await init_database()
+
+    total = args.owners or 10000
+    steps = [n for n in (100, 1000, 10000, 100000) if n < total] + [total]
+    seeded = 0
+    ok = True
+    print(f"{'owners':>8} {'route':<15} {'p50 ms':>8} {'p99 ms':>8} {'keys':>5} {'docs':>5} {'ret':>4}  plan")
+    for step in steps:
+        started = time.perf_counter()
+        await insert_owners(seeded, step)
+        seeded = step
+        print(f"-- seeded {step} owners in {time.perf_counter() - started:.1f}s")
+
+        owners = [f"owner-{random.randrange(step):05d}" for _ in range(args.samples)]
+        for name, handler, collection, sort in routes:
+            latencies = []
+            for owner in owners:
+                t0 = time.perf_counter()
+                await handler(Response(), owner=owner)
+                latencies.append(time.perf_counter() - t0)
+
+            plan = await explain_owner_query(collection, owners[0], sort)
+            index_only = (
+                "COLLSCAN" not in plan["stages"] and "SORT" not in plan["stages"]
+                and plan["docs_examined"] == plan["returned"]
+                and plan["keys_examined"] <= plan["returned"] + 1
+            )
+            ok = ok and index_only
+            print(f"{step:>8} {name:<15} {statistics.median(latencies) * 1000:>8.2f} "
+                  f"{percentile(latencies, 99) * 1000:>8.2f} {plan['keys_examined']:>5} "
+                  f"{plan['docs_examined']:>5} {plan['returned']:>4}  "
+                  f"{'>'.join(plan['stages'])}{'' if index_only else '  <-- not index-bounded'}")
+
+    await client.drop_database(db.name)
+    return 0 if ok else 1
+
+
+async def _log_storm(logger, records, burst=200):
+    """Emit error bursts with tracebacks while measuring event-loop lag"""
+    lags = []
+    stop = asyncio.Event()
+
+    async def monitor():
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - t0 - 0.001)
+
+    monitor_task = asyncio.create_task(monitor())
+    await asyncio.sleep(0.01)
+    in_logging = 0.0
+    for sent in range(0, records, burst):
+        t0 = time.perf_counter()
+        for i in range(sent, min(sent + burst, records)):
+            try:
+                raise RuntimeError(f"storm {i}")
+            except RuntimeError as e:
+                logger.error("Error getting projects: %s", e, exc_info=True)
+        in_logging += time.perf_counter() - t0
+        await asyncio.sleep(0)
+    stop.set()
+    await monitor_task
+    return in_logging, lags
+
+
+async def bench_logging(args):
+    """Event-loop time spent logging an error storm: synchronous handler vs queue pipeline"""
+    import logging
+    import queue
+    import tempfile
+    from logging_config import DeferredQueueHandler, JsonFormatter, LogListener
+
+    class SlowFileHandler(logging.FileHandler):
+        """File handler whose writes block like a congested stdout pipe or log shipper"""
+
+        def emit(self, record):
+            super().emit(record)
+            time.sleep(args.sink_latency_us / 1e6)
+
+    print(f"sink latency {args.sink_latency_us} us per record")
+    print(f"{'pipeline':<10} {'records':>8} {'loop ms':>9} {'us/rec':>8} {'lag p99 ms':>11} {'lag max ms':>11} {'dropped':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("sync", "queue"):
+            file_handler = SlowFileHandler(os.path.join(tmp, f"{mode}.log"))
+            file_handler.setFormatter(JsonFormatter())
+            logger = logging.getLogger(f"bench.{mode}")
+            logger.propagate = False
+            listener = None
+            if mode == "sync":
+                logger.addHandler(file_handler)
+            else:
+                handler = DeferredQueueHandler(queue.Queue(maxsize=10000))
+                listener = LogListener(handler.queue, file_handler)
+                listener.start()
+                logger.addHandler(handler)
+
+            in_logging, lags = await _log_storm(logger, args.records)
+            if listener:
+                listener.stop()
+            dropped = logger.handlers[0].dropped if mode == "queue" else 0
+            file_handler.close()
+            logger.handlers.clear()
+
+            print(f"{mode:<10} {args.records:>8} {in_logging * 1000:>9.1f} {in_logging / args.records * 1e6:>8.1f} "
+                  f"{percentile(lags, 99) * 1000:>11.2f} {max(lags) * 1000:>11.2f} {dropped:>8}")
+    return 0
+
+
+async def insert_view_owners(owners, per_owner):
+    """Insert per_owner projects for each bench owner and build their portfolio views"""
+    from datetime import datetime, timedelta
+    from database import projects_collection
+    from models import Project
+    from portfolio_view import build_view
+    from seed_data import MOCK_DATA
+
+    base = datetime(2025, 1, 1)
+    for start in range(0, owners, 50):
+        documents = []
+        for o in range(start, min(start + 50, owners)):
+            for i in range(per_owner):
+                template = MOCK_DATA["projects"][i % len(MOCK_DATA["projects"])]
+                created_at = base + timedelta(seconds=i)
+                documents.append(Project(**{**template, "title": f"{template['title']} #{i}"}, owner=f"owner-{o:05d}",
+                                         created_at=created_at, updated_at=created_at).dict())
+        await projects_collection.insert_many(documents, ordered=False)
+    for o in range(owners):
+        await build_view(f"owner-{o:05d}")
+
+
+async def _retained(build):
+    """(result, bytes still allocated once build's temporaries are freed)"""
+    import gc
+    import tracemalloc
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = await build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+async def bench_memory(args):
+    """Retained memory and render time for owners' views: raw documents vs Pydantic models vs PortfolioSnapshot.
+
+    Everything is loaded through get_view, the path SnapshotStore uses, so
+    each owner holds at most VIEW_SECTION_LIMIT projects as in production.
+    """
+    import json
+    from fastapi.encoders import jsonable_encoder
+    from database import client, db, init_database
+    from models import Project
+    from portfolio_snapshot import PortfolioSnapshot
+    from portfolio_view import VIEW_SECTION_LIMIT, get_view
+
+    owners = [f"owner-{o:05d}" for o in range(args.owners or 1000)]
+    await client.drop_database(db.name)
+    await init_database()
+    started = time.perf_counter()
+    await insert_view_owners(len(owners), VIEW_SECTION_LIMIT)
+    projects = len(owners) * VIEW_SECTION_LIMIT
+    print(f"-- seeded {len(owners)} owners x {VIEW_SECTION_LIMIT} projects in {time.perf_counter() - started:.1f}s")
+
+    async def load_documents():
+        return [(await get_view(owner))["projects"] for owner in owners]
+
+    async def load_models():
+        return [[Project(**document) for document in (await get_view(owner))["projects"]] for owner in owners]
+
+    async def load_snapshots():
+        return [PortfolioSnapshot(await get_view(owner)) for owner in owners]
+
+    documents, documents_bytes = await _retained(load_documents)
+    del documents
+    models, models_bytes = await _retained(load_models)
+    snapshots, snapshot_bytes = await _retained(load_snapshots)
+    await client.drop_database(db.name)
+
+    print(f"{projects} projects across {len(owners)} owners, retained memory")
+    for name, size in (("documents", documents_bytes), ("pydantic models", models_bytes), ("snapshots", snapshot_bytes)):
+        print(f"  {name:<16} {size / 1e6:>8.1f} MB  {size / projects:>7.0f} B/project")
+
+    def timed(render, repeat=50):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            body = render()
+        return (time.perf_counter() - started) / repeat * 1000, body
+
+    snapshot = snapshots[0]
+    models_ms, models_body = timed(lambda: json.dumps(jsonable_encoder(models[0]), separators=(",", ":")).encode())
+
+    def render_uncached():
+        snapshot._json.clear()
+        return snapshot.section_json("projects")
+
+    first_ms, _ = timed(render_uncached)
+    cached_ms, snapshot_body = timed(lambda: snapshot.section_json("projects"))
+    print(f"render one owner's {VIEW_SECTION_LIMIT} projects as JSON")
+    print(f"  {'pydantic models':<16} {models_ms:>8.3f} ms")
+    print(f"  {'snapshot':<16} {first_ms:>8.3f} ms  (cached: {cached_ms:.4f} ms)")
+    print(f"  identical output: {json.loads(models_body) == json.loads(snapshot_body)}")
+    return 0
+
+
+BENCHMARKS = {
+    "owners": bench_owners,
+    "logging": bench_logging,
+    "memory": bench_memory,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio backend benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--owners", type=int, help="owners to seed (default 10000 for owners, 1000 for memory)")
+    parser.add_argument("--samples", type=int, default=200, help="reads per route and step")
+    parser.add_argument("--records", type=int, default=20000, help="error records to log (logging benchmark)")
+    parser.add_argument("--sink-latency-us", type=float, default=100, help="simulated blocking time per log write")
+    args = parser.parse_args()
+    return asyncio.run(BENCHMARKS[args.benchmark](args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import base64
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from database import (
+    profiles_collection, projects_collection, skills_collection,
+    achievements_collection, certifications_collection, tombstones_collection,
+    SERVER_SELECTION_TIMEOUT_MS, SOCKET_TIMEOUT_MS
+)
+
+logger = logging.getLogger(__name__)
+
+# Every collection clients can sync, plus the tombstones left by deletes
+CHANGE_SOURCES = {
+    collection.name: collection
+    for collection in (profiles_collection, projects_collection, skills_collection,
+                       achievements_collection, certifications_collection, tombstones_collection)
+}
+
+UPDATED_ASC = [("updated_at", 1), ("id", 1)]
+
+# Changes newer than this are held back so writes that commit slightly out of
+# updated_at order cannot slip in behind a token a client already holds. Writes
+# are stamped before they are sent, so the window has to cover the longest a
+# single insert can take before the driver gives up: server selection plus
+# socket timeout. The write-behind queue re-stamps documents before each retry,
+# so its backoff does not count against the window.
+SETTLE_WINDOW = timedelta(milliseconds=int(
+    os.environ.get("CHANGES_SETTLE_MS", str(SERVER_SELECTION_TIMEOUT_MS + SOCKET_TIMEOUT_MS))
+))
+
+
+# Tombstones are expired by a TTL index after this long (see indexes.py). A
+# token or ``since`` older than the window may have missed deletes, so such
+# clients must drop their copy and resync from the beginning.
+TOMBSTONE_RETENTION = timedelta(days=int(os.environ.get("CHANGES_TOMBSTONE_RETENTION_DAYS", "30")))
+
+
+class InvalidTokenError(ValueError):
+    """Raised when a changes token cannot be decoded"""
+
+
+class ResyncRequiredError(Exception):
+    """Raised when a sync position is older than the tombstone retention window"""
+
+
+def encode_token(updated_at, source, document_id):
+    """Opaque resume token for the position just after (updated_at, source, document_id)"""
+    raw = json.dumps([updated_at.isoformat(), source, document_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        updated_at, source, document_id = json.loads(raw)
+        return datetime.fromisoformat(updated_at), source, document_id
+    except Exception as e:
+        raise InvalidTokenError(f"Invalid changes token: {e}")
+
+
+def _after(source, position):
+    """Filter selecting documents of one source ordered after position.
+
+    Changes are ordered by (updated_at, source name, id); a position without
+    a source name (a plain ``since`` timestamp) selects strictly later times.
+    """
+    updated_at, position_source, document_id = position
+    if position_source is None or source < position_source:
+        return {"updated_at": {"$gt": updated_at}}
+    if source > position_source:
+        return {"updated_at": {"$gte": updated_at}}
+    return {"$or": [
+        {"updated_at": {"$gt": updated_at}},
+        {"updated_at": updated_at, "id": {"$gt": document_id}},
+    ]}
+
+
+def check_retention(position):
+    """Raise ResyncRequiredError for a position older than the tombstone retention window.
+
+    Kept separate from load_changes so callers can reject such positions
+    before going to the database; they are client errors, not database ones.
+    """
+    if position and position[0] < datetime.utcnow() - TOMBSTONE_RETENTION:
+        raise ResyncRequiredError(
+            f"Sync position is older than the {TOMBSTONE_RETENTION.days} day tombstone retention; "
+            "resync without since or token"
+        )
+
+
+async def load_changes(owner, position, limit):
+    """Return (entries, next_token, has_more) for up to limit changes after position.
+
+    Once a client has caught up, the token moves to the settle horizon even
+    when nothing changed, so an owner with no recent writes never hands out
+    a token that ages past the retention window.
+    """
+    horizon = datetime.utcnow() - SETTLE_WINDOW
+    # MongoDB stores milliseconds; a finer horizon would skip writes in the same millisecond
+    horizon = horizon.replace(microsecond=horizon.microsecond // 1000 * 1000)
+    entries = []
+    for source, collection in CHANGE_SOURCES.items():
+        query = {"owner": owner, "updated_at": {"$lte": horizon}}
+        if position:
+            after = _after(source, position)
+            if "updated_at" in after:
+                query["updated_at"].update(after["updated_at"])
+            else:
+                query.update(after)
+        documents = await collection.find(query, {"_id": 0}).sort(UPDATED_ASC).to_list(limit + 1)
+        entries += [(document["updated_at"], source, document["id"], document) for document in documents]
+
+    entries.sort(key=lambda entry: entry[:3])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    if has_more:
+        next_token = encode_token(*entries[-1][:3])
+    elif position and position[0] >= horizon:
+        # Issued by a worker whose clock runs ahead; don't move the client backwards
+        next_token = encode_token(*position)
+    else:
+        # Everything up to the horizon has been returned
+        next_token = encode_token(horizon, None, None)
+
+    changes = []
+    for updated_at, source, document_id, document in entries:
+        if source == tombstones_collection.name:
+            changes.append({"collection": document["collection"], "op": "delete", "id": document_id, "updated_at": updated_at})
+        else:
+            changes.append({"collection": source, "op": "upsert", "id": document_id, "updated_at": updated_at, "document": document})
+    return changes, next_token, has_more
+
+
+async def delete_with_tombstones(collection, query):
+    """Delete matching documents, leaving a tombstone for each so syncing clients see the delete"""
+    documents = await collection.find(query, {"_id": 0, "id": 1, "owner": 1}).to_list(None)
+    if not documents:
+        return 0
+    now = datetime.utcnow()
+    await tombstones_collection.insert_many([
+        {"id": document["id"], "owner": document["owner"], "collection": collection.name, "updated_at": now}
+        for document in documents
+    ])
+    result = await collection.delete_many({"id": {"$in": [document["id"] for document in documents]}})
+    return result.deleted_count
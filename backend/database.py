@@ -1,15 +1,18 @@
 import os
+import threading
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
 from dotenv import load_dotenv
 from pathlib import Path
 import logging
+from logging_config import configure_logging
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # MongoDB connection
@@ -17,29 +20,77 @@ mongo_url = os.environ.get('MONGO_URL')
 if not mongo_url:
     raise ValueError("MONGO_URL environment variable is not set")
 
-client = AsyncIOMotorClient(mongo_url)
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Counts connections currently checked out of the driver's pools"""
+
+    def __init__(self):
+        self.checked_out = 0
+        self._lock = threading.Lock()
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_created(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): pass
+    def connection_check_out_started(self, event): pass
+    def connection_check_out_failed(self, event): pass
+
+pool_monitor = PoolMonitor()
+MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+
+# Keep driver-level timeouts short so an unreachable server fails fast
+# instead of holding requests for the 30s driver default
+SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '2000'))
+SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '5000'))
+client = AsyncIOMotorClient(
+    mongo_url,
+    serverSelectionTimeoutMS=SERVER_SELECTION_TIMEOUT_MS,
+    connectTimeoutMS=int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '2000')),
+    socketTimeoutMS=SOCKET_TIMEOUT_MS,
+    maxPoolSize=MAX_POOL_SIZE,
+    event_listeners=[pool_monitor],
+)
 db = client[os.environ.get('DB_NAME', 'portfolio')]
 
+# Owner served when a request does not name one
+DEFAULT_OWNER = os.environ.get('DEFAULT_OWNER', 'default')
+
 # Collection references
 profiles_collection = db.profiles
 projects_collection = db.projects
 skills_collection = db.skills
 achievements_collection = db.achievements
 certifications_collection = db.certifications
+portfolio_views_collection = db.portfolio_views
+tombstones_collection = db.tombstones
 
 async def init_database():
     """Initialize database with indexes and setup"""
     try:
-        # Create indexes
-        await profiles_collection.create_index("created_at")
-        await projects_collection.create_index("created_at")
-        await skills_collection.create_index("category")
-        await achievements_collection.create_index("created_at")
-        await certifications_collection.create_index("created_at")
+        # Assign documents written before owner scoping to the default owner
+        for collection in (profiles_collection, projects_collection, skills_collection,
+                           achievements_collection, certifications_collection):
+            result = await collection.update_many({"owner": {"$exists": False}}, {"$set": {"owner": DEFAULT_OWNER}})
+            if result.modified_count:
+                logger.info("Assigned %s %s documents to owner '%s'", result.modified_count, collection.name, DEFAULT_OWNER)
+
+        # Create any indexes from the declarative spec that are missing
+        from indexes import reconcile_indexes
+        await reconcile_indexes()
         
         logger.info("Database initialized successfully")
     except Exception as e:
-        logger.error(f"Failed to initialize database: {e}")
+        logger.error("Failed to initialize database: %s", e)
         raise
 
 async def close_database():
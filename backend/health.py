@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import os
+import signal
+import time
+
+import uvicorn
+
+from database import db, pool_monitor, MAX_POOL_SIZE
+from resilience import last_known_good
+
+logger = logging.getLogger(__name__)
+
+STARTING = "starting"
+READY = "ready"
+DRAINING = "draining"
+
+
+class DependencyProbe:
+    """Background-refreshed readiness state.
+
+    One task pings Mongo every interval and records the round trip and pool
+    saturation; another samples event-loop lag every 100 ms. The readiness
+    endpoint only reads the cached result, so load-balancer probes never
+    touch the database themselves.
+
+    require_db decides whether an unreachable Mongo fails readiness: "true"
+    always, "false" never, and "auto" only while there is no last-known-good
+    data to serve, so a database outage does not pull every instance that
+    could still answer from the fallback cache.
+    """
+
+    def __init__(self, interval=2.0, ping_timeout=1.0, max_loop_lag=0.5, max_pool_saturation=0.9,
+                 require_db="auto", drain_delay=5.0):
+        self.interval = interval
+        self.ping_timeout = ping_timeout
+        self.max_loop_lag = max_loop_lag
+        self.max_pool_saturation = max_pool_saturation
+        self.require_db = require_db
+        self.drain_delay = drain_delay
+        self.lifecycle = STARTING
+        self.mongo = {"ok": False, "rtt_ms": None, "error": "not probed yet", "checked_at": None}
+        self._loop_lag = 0.0
+        self._max_loop_lag_window = 0.0
+        self._tasks = []
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            interval=int(os.environ.get("READINESS_PROBE_INTERVAL_MS", "2000")) / 1000,
+            ping_timeout=int(os.environ.get("READINESS_PING_TIMEOUT_MS", "1000")) / 1000,
+            max_loop_lag=int(os.environ.get("READINESS_MAX_LOOP_LAG_MS", "500")) / 1000,
+            max_pool_saturation=float(os.environ.get("READINESS_MAX_POOL_SATURATION", "0.9")),
+            require_db=os.environ.get("READINESS_REQUIRE_DB", "auto").lower(),
+            drain_delay=int(os.environ.get("READINESS_DRAIN_DELAY_MS", "5000")) / 1000,
+        )
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._probe_mongo()), asyncio.create_task(self._sample_loop_lag())]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _probe_mongo(self):
+        while True:
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(db.command("ping"), self.ping_timeout)
+                self.mongo = {"ok": True, "rtt_ms": round((time.perf_counter() - started) * 1000, 2), "error": None}
+            except Exception as e:
+                self.mongo = {"ok": False, "rtt_ms": None, "error": repr(e)}
+            self.mongo["checked_at"] = time.monotonic()
+            self._loop_lag, self._max_loop_lag_window = self._max_loop_lag_window, 0.0
+            await asyncio.sleep(self.interval)
+
+    async def _sample_loop_lag(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(0.1)
+            lag = time.monotonic() - started - 0.1
+            self._max_loop_lag_window = max(self._max_loop_lag_window, lag)
+
+    def readiness(self):
+        """(ready, details) from the cached probe results"""
+        checked_at = self.mongo["checked_at"]
+        probe_age = time.monotonic() - checked_at if checked_at else None
+        saturation = pool_monitor.checked_out / MAX_POOL_SIZE
+        loop_lag = max(self._loop_lag, self._max_loop_lag_window)
+
+        mongo_ok = self.mongo["ok"] and probe_age is not None and probe_age <= 3 * self.interval
+        serving_stale = not mongo_ok and len(last_known_good) > 0
+        require_db = self.require_db in ("1", "true", "yes") or (self.require_db == "auto" and not serving_stale)
+
+        reasons = []
+        if self.lifecycle != READY:
+            reasons.append(self.lifecycle)
+        if require_db and not self.mongo["ok"]:
+            reasons.append("mongo unreachable")
+        if require_db and (probe_age is None or probe_age > 3 * self.interval):
+            reasons.append("mongo probe stale")
+        if saturation >= self.max_pool_saturation:
+            reasons.append("connection pool saturated")
+        if loop_lag >= self.max_loop_lag:
+            reasons.append("event loop lagging")
+
+        return not reasons, {
+            "status": "ready" if not reasons else "not_ready",
+            "reasons": reasons,
+            "lifecycle": self.lifecycle,
+            "serving_stale": serving_stale,
+            "mongo": {
+                "ok": self.mongo["ok"],
+                "rtt_ms": self.mongo["rtt_ms"],
+                "error": self.mongo["error"],
+                "probe_age_s": round(probe_age, 2) if probe_age is not None else None,
+            },
+            "pool": {"checked_out": pool_monitor.checked_out, "max_size": MAX_POOL_SIZE, "saturation": round(saturation, 3)},
+            "event_loop_lag_ms": round(loop_lag * 1000, 2),
+        }
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn.Server that reports draining for drain_delay seconds before shutting down.
+
+    Uvicorn stops accepting connections as soon as it handles SIGTERM, so the
+    drain window has to start before that: the first SIGTERM marks the probe
+    draining, so /ready returns 503 while load balancers take the instance
+    out, and the server only begins its shutdown after drain_delay. A second
+    SIGTERM, or SIGINT, shuts down immediately. Run the app through this
+    server (python server.py); plain ``uvicorn server:app`` has no drain
+    window, so give such deployments a pre-stop delay instead.
+    """
+
+    def __init__(self, config, probe):
+        super().__init__(config)
+        self.probe = probe
+        self._loop = None
+
+    async def serve(self, sockets=None):
+        self._loop = asyncio.get_running_loop()
+        await super().serve(sockets)
+
+    def handle_exit(self, sig, frame):
+        if sig != signal.SIGTERM or self.probe.drain_delay <= 0 or self.probe.lifecycle == DRAINING or self._loop is None:
+            super().handle_exit(sig, frame)
+            return
+        self.probe.lifecycle = DRAINING
+        logger.info("SIGTERM received, draining for %.1fs before shutdown", self.probe.drain_delay)
+        # Signal handlers may run outside the loop's callbacks (uvicorn >= 0.29 uses signal.signal)
+        self._loop.call_soon_threadsafe(self._loop.call_later, self.probe.drain_delay, super().handle_exit, sig, frame)
+
+
+dependency_probe = DependencyProbe.from_env()
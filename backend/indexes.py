@@ -0,0 +1,212 @@
+"""Declarative index management.
+
+INDEX_SPECS lists the indexes each collection should have. reconcile_indexes()
+creates the missing ones (run by init_database at startup) and reports
+indexes that exist but are not declared; the CLI additionally reports unused
+indexes from $indexStats, redundant prefix indexes and route query shapes
+that no index serves:
+
+    python indexes.py [--apply] [--drop-extraneous]
+"""
+import asyncio
+import json
+import logging
+import sys
+
+from pymongo import IndexModel
+
+from changes import TOMBSTONE_RETENTION
+from database import db
+
+logger = logging.getLogger(__name__)
+
+
+def index_name(keys):
+    """Default MongoDB index name for a key pattern, e.g. owner_1_created_at_-1"""
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+UPDATED_AT_INDEX = [("owner", 1), ("updated_at", 1), ("id", 1)]
+# Write-status lookups and the write-behind retry check match ids within an owner
+OWNER_ID_INDEX = [("owner", 1), ("id", 1)]
+TOMBSTONE_TTL_INDEX = [("updated_at", 1)]
+
+INDEX_SPECS = {
+    "profiles": [
+        [("owner", 1), ("created_at", 1)],
+        UPDATED_AT_INDEX,
+        OWNER_ID_INDEX,
+    ],
+    "projects": [
+        [("owner", 1), ("created_at", -1)],
+        UPDATED_AT_INDEX,
+        OWNER_ID_INDEX,
+    ],
+    "skills": [
+        [("owner", 1), ("category", 1)],
+        UPDATED_AT_INDEX,
+        OWNER_ID_INDEX,
+    ],
+    "achievements": [
+        [("owner", 1), ("created_at", -1)],
+        UPDATED_AT_INDEX,
+        OWNER_ID_INDEX,
+    ],
+    "certifications": [
+        [("owner", 1), ("created_at", -1)],
+        UPDATED_AT_INDEX,
+        OWNER_ID_INDEX,
+    ],
+    "portfolio_views": [],
+    "tombstones": [
+        UPDATED_AT_INDEX,
+        TOMBSTONE_TTL_INDEX,
+    ],
+}
+
+# Extra IndexModel options by (collection, index name)
+INDEX_OPTIONS = {
+    ("tombstones", index_name(TOMBSTONE_TTL_INDEX)): {"expireAfterSeconds": int(TOMBSTONE_RETENTION.total_seconds())},
+}
+
+ID_INDEX = [("_id", 1)]
+
+
+def normalize_keys(keys):
+    return [(field, int(direction)) for field, direction in keys]
+
+
+async def existing_indexes(collection_name, with_ttl=False):
+    """Map index name -> normalized key pattern for one collection.
+
+    With with_ttl, map index name -> (key pattern, expireAfterSeconds or None).
+    """
+    indexes = {}
+    async for index in db[collection_name].list_indexes():
+        keys = normalize_keys(index["key"].items())
+        indexes[index["name"]] = (keys, index.get("expireAfterSeconds")) if with_ttl else keys
+    return indexes
+
+
+async def reconcile_indexes(apply=True, drop_extraneous=False):
+    """Bring every collection's indexes in line with INDEX_SPECS.
+
+    Missing indexes are created with background builds so large collections
+    are not locked for the duration, and TTL indexes whose expireAfterSeconds
+    differs from INDEX_OPTIONS are updated in place; undeclared indexes are
+    only dropped when drop_extraneous is set. Returns a per-collection report.
+    """
+    report = {}
+    for collection_name, specs in INDEX_SPECS.items():
+        collection = db[collection_name]
+        existing_ttl = await existing_indexes(collection_name, with_ttl=True)
+        existing = {name: keys for name, (keys, _) in existing_ttl.items()}
+        existing_keys = list(existing.values())
+
+        missing = [keys for keys in specs if keys not in existing_keys]
+        extraneous = [name for name, keys in existing.items() if keys != ID_INDEX and keys not in specs]
+        ttl_changed = []
+        for keys, ttl in existing_ttl.values():
+            wanted = INDEX_OPTIONS.get((collection_name, index_name(keys)), {}).get("expireAfterSeconds")
+            if keys in specs and wanted is not None and ttl != wanted:
+                ttl_changed.append(keys)
+
+        if apply and missing:
+            await collection.create_indexes([
+                IndexModel(keys, name=index_name(keys), background=True,
+                           **INDEX_OPTIONS.get((collection_name, index_name(keys)), {}))
+                for keys in missing
+            ])
+            logger.info("Created indexes on %s: %s", collection_name, [index_name(keys) for keys in missing])
+        if apply:
+            for keys in ttl_changed:
+                ttl = INDEX_OPTIONS[(collection_name, index_name(keys))]["expireAfterSeconds"]
+                await db.command("collMod", collection_name, index={"keyPattern": dict(keys), "expireAfterSeconds": ttl})
+                logger.info("Set expireAfterSeconds=%s on %s.%s", ttl, collection_name, index_name(keys))
+        if drop_extraneous:
+            for name in extraneous:
+                await collection.drop_index(name)
+                logger.info("Dropped undeclared index %s.%s", collection_name, name)
+
+        report[collection_name] = {
+            "missing" if not apply else "created": [index_name(keys) for keys in missing],
+            "dropped" if drop_extraneous else "extraneous": extraneous,
+            "ttl_outdated" if not apply else "ttl_updated": [index_name(keys) for keys in ttl_changed],
+        }
+    return report
+
+
+async def index_usage(collection_name):
+    """Map index name -> number of operations since the server started tracking, via $indexStats"""
+    usage = {}
+    async for stats in db[collection_name].aggregate([{"$indexStats": {}}]):
+        usage[stats["name"]] = stats["accesses"]["ops"]
+    return usage
+
+
+def redundant_indexes(indexes):
+    """Names of indexes whose key pattern is a strict prefix of another index"""
+    redundant = []
+    for name, keys in indexes.items():
+        if keys == ID_INDEX:
+            continue
+        if any(other != keys and other[:len(keys)] == keys for other in indexes.values()):
+            redundant.append(name)
+    return redundant
+
+
+def covers(keys, shape):
+    """True if an index with this key pattern serves the shape's equality filter and sort"""
+    filter_fields = set(shape["filter"])
+    if {field for field, _ in keys[:len(filter_fields)]} != filter_fields:
+        return False
+    sort = normalize_keys(shape["sort"])
+    rest = keys[len(filter_fields):len(filter_fields) + len(sort)]
+    reverse = [(field, -direction) for field, direction in sort]
+    return not sort or rest == sort or rest == reverse
+
+
+def uncovered_query_shapes(indexes_by_collection):
+    """Route query shapes from portfolio_routes that no index in indexes_by_collection serves"""
+    from portfolio_routes import QUERY_SHAPES
+
+    uncovered = []
+    for shape in QUERY_SHAPES:
+        candidates = [ID_INDEX] + indexes_by_collection.get(shape["collection"], [])
+        if not any(covers(keys, shape) for keys in candidates):
+            uncovered.append(shape["route"])
+    return uncovered
+
+
+async def index_report(apply=False, drop_extraneous=False):
+    """Reconcile (optionally) and report unused, redundant and missing-coverage indexes"""
+    report = {"collections": await reconcile_indexes(apply=apply, drop_extraneous=drop_extraneous)}
+
+    live = {}
+    for collection_name, collection_report in report["collections"].items():
+        indexes = await existing_indexes(collection_name)
+        live[collection_name] = list(indexes.values())
+        collection_report["redundant"] = redundant_indexes(indexes)
+        try:
+            usage = await index_usage(collection_name)
+            collection_report["unused"] = sorted(name for name, ops in usage.items() if ops == 0 and name != "_id_")
+        except Exception as e:
+            collection_report["unused"] = f"unavailable: {e}"
+
+    report["uncovered_queries"] = {
+        "spec": uncovered_query_shapes(INDEX_SPECS),
+        "live": uncovered_query_shapes(live),
+    }
+    return report
+
+
+async def main(argv):
+    report = await index_report(apply="--apply" in argv, drop_extraneous="--drop-extraneous" in argv)
+    print(json.dumps(report, indent=2))
+    missing = any(r.get("missing") for r in report["collections"].values())
+    uncovered = report["uncovered_queries"]["spec"] or report["uncovered_queries"]["live"]
+    return 1 if missing or uncovered else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -0,0 +1,209 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+# (uvicorn's color_message duplicates the message with ANSI codes)
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName", "color_message"}
+
+_listener = None
+
+access_logger = logging.getLogger("access")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any ``extra`` fields"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread.
+
+    The stock handler renders the message in the logging thread; this one
+    only enqueues the record. When the queue is full, records of any level
+    are dropped and counted rather than blocking the caller, which is usually
+    the event loop; the count is logged as a warning once there is room again.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+            return
+        if self._unreported:
+            self._report_dropped()
+
+    def _report_dropped(self):
+        summary = logging.makeLogRecord({
+            "name": __name__,
+            "levelno": logging.WARNING,
+            "levelname": "WARNING",
+            "msg": "Dropped %s log records while the log queue was full",
+            "args": (self._unreported,),
+            "dropped": self._unreported,
+        })
+        try:
+            self.queue.put_nowait(summary)
+        except queue.Full:
+            return
+        self._unreported = 0
+
+
+class LogListener(logging.handlers.QueueListener):
+    """QueueListener whose stop() waits for room in a bounded queue.
+
+    The stock listener enqueues its stop sentinel with put_nowait, which
+    raises queue.Full when the queue is full and leaves the thread running
+    with its records unflushed.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def configure_logging():
+    """Route all logging through a queue drained by a background listener thread.
+
+    Safe to call more than once; only the first call installs the pipeline.
+    LOG_LEVEL, LOG_FORMAT (json or text) and LOG_QUEUE_SIZE configure it.
+    Uvicorn's loggers are routed through the same queue (see
+    adopt_uvicorn_loggers).
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    if os.environ.get("LOG_FORMAT", "json").lower() == "text":
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    else:
+        formatter = JsonFormatter()
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=int(os.environ.get("LOG_QUEUE_SIZE", "10000")))
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+
+    adopt_uvicorn_loggers()
+
+    _listener = LogListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def adopt_uvicorn_loggers():
+    """Send uvicorn's server logs through the root queue handler.
+
+    Uvicorn gives its loggers their own stream handlers with propagate off,
+    and installs them whenever its config is created, which can be after this
+    module's configure_logging() ran; the app's lifespan calls this again on
+    startup. Uvicorn's unsampled access log is turned off, since
+    AccessLogMiddleware replaces it.
+    """
+    for name in ("uvicorn", "uvicorn.error"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+    uvicorn_access = logging.getLogger("uvicorn.access")
+    uvicorn_access.handlers.clear()
+    uvicorn_access.propagate = False
+    uvicorn_access.disabled = True
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class AccessLogMiddleware:
+    """ASGI middleware writing one structured access log entry per sampled request.
+
+    Requests are logged with probability sample_rate; error responses and
+    unhandled exceptions are always logged, 5xx at ERROR and 4xx at WARNING.
+    """
+
+    def __init__(self, app, sample_rate=1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            self._log(scope, 500, started, logging.ERROR)
+            raise
+
+        if status >= 500:
+            self._log(scope, status, started, logging.ERROR)
+        elif status >= 400:
+            self._log(scope, status, started, logging.WARNING)
+        elif random.random() < self.sample_rate:
+            self._log(scope, status, started, logging.INFO)
+
+    def _log(self, scope, status, started, level):
+        if not access_logger.isEnabledFor(level):
+            return
+        access_logger.log(
+            level, "%s %s %s", scope["method"], scope["path"], status,
+            extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "sample_rate": self.sample_rate,
+            },
+        )
+
+
+def install_access_log(app):
+    """Add AccessLogMiddleware with ACCESS_LOG_SAMPLE_RATE (0.0 - 1.0, default 0.1)"""
+    app.add_middleware(AccessLogMiddleware, sample_rate=float(os.environ.get("ACCESS_LOG_SAMPLE_RATE", "0.1")))
@@ -3,6 +3,9 @@ from typing import List, Optional
 from datetime import datetime
 import uuid
 
+# Owner slugs scope every document to one portfolio
+OWNER_SLUG_PATTERN = r"^[a-z0-9][a-z0-9-]{0,62}$"
+
 class ContactInfo(BaseModel):
     email: str
     phone: str
@@ -15,6 +18,7 @@ class EducationInfo(BaseModel):
 
 class Profile(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    owner: str = Field(pattern=OWNER_SLUG_PATTERN)
     about: str
     contact: ContactInfo
     education: EducationInfo
@@ -28,6 +32,7 @@ class ProfileCreate(BaseModel):
 
 class Project(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    owner: str = Field(pattern=OWNER_SLUG_PATTERN)
     title: str
     description: str
     highlights: List[str]
@@ -43,6 +48,7 @@ class ProjectCreate(BaseModel):
 
 class SkillCategory(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    owner: str = Field(pattern=OWNER_SLUG_PATTERN)
     category: str
     items: List[str]
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -54,6 +60,7 @@ class SkillCategoryCreate(BaseModel):
 
 class Achievement(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    owner: str = Field(pattern=OWNER_SLUG_PATTERN)
     title: str
     description: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -65,6 +72,7 @@ class AchievementCreate(BaseModel):
 
 class Certification(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    owner: str = Field(pattern=OWNER_SLUG_PATTERN)
     name: str
     issuer: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -72,4 +80,26 @@ class Certification(BaseModel):
 
 class CertificationCreate(BaseModel):
     name: str
-    issuer: str
\ No newline at end of file
+    issuer: str
+
+class Change(BaseModel):
+    collection: str
+    op: str
+    id: str
+    updated_at: datetime
+    document: Optional[dict] = None
+
+class ChangesPage(BaseModel):
+    changes: List[Change]
+    next_token: str
+    has_more: bool
+
+class PortfolioView(BaseModel):
+    owner: str
+    version: int
+    profile: Optional[Profile] = None
+    projects: List[Project] = []
+    skills: List[SkillCategory] = []
+    achievements: List[Achievement] = []
+    certifications: List[Certification] = []
+    updated_at: datetime
@@ -1,117 +1,349 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import JSONResponse
 from typing import List
 from models import (
     Profile, ProfileCreate, Project, ProjectCreate, 
     SkillCategory, SkillCategoryCreate, Achievement, AchievementCreate,
-    Certification, CertificationCreate
+    Certification, CertificationCreate, PortfolioView, ChangesPage, OWNER_SLUG_PATTERN
 )
 from database import (
     profiles_collection, projects_collection, skills_collection,
-    achievements_collection, certifications_collection
+    achievements_collection, certifications_collection, DEFAULT_OWNER
 )
+from write_behind import write_queue, WriteQueueFullError, WriteQueueClosedError
+from portfolio_view import SECTIONS, apply_inserts, get_view
+from changes import (
+    CHANGE_SOURCES, UPDATED_ASC, InvalidTokenError, ResyncRequiredError, check_retention, decode_token, load_changes
+)
+from resilience import db_breaker, last_known_good, CircuitOpenError
+from portfolio_snapshot import snapshot_store
+from datetime import datetime, timezone
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
 
+# Collections the create routes write to, searched by the write status route
+WRITE_COLLECTIONS = [
+    profiles_collection, projects_collection, skills_collection,
+    achievements_collection, certifications_collection,
+]
+
+CREATED_DESC = [("created_at", -1)]
+CATEGORY_ASC = [("category", 1)]
+
+# Query shapes issued by the routes below; indexes.py checks each one is served by an index
+QUERY_SHAPES = [
+    {"route": "GET /profile", "collection": "profiles", "filter": ["owner"], "sort": []},
+    {"route": "GET /projects", "collection": "projects", "filter": ["owner"], "sort": CREATED_DESC},
+    {"route": "GET /skills", "collection": "skills", "filter": ["owner"], "sort": CATEGORY_ASC},
+    {"route": "GET /achievements", "collection": "achievements", "filter": ["owner"], "sort": CREATED_DESC},
+    {"route": "GET /certifications", "collection": "certifications", "filter": ["owner"], "sort": CREATED_DESC},
+    {"route": "GET /view", "collection": "portfolio_views", "filter": ["_id"], "sort": []},
+] + [
+    {"route": f"GET /writes/{{id}} ({collection.name})", "collection": collection.name, "filter": ["owner", "id"], "sort": []}
+    for collection in WRITE_COLLECTIONS
+] + [
+    {"route": f"GET /changes ({source})", "collection": source, "filter": ["owner"], "sort": UPDATED_ASC}
+    for source in CHANGE_SOURCES
+]
+
+def get_owner(owner: str = Query(DEFAULT_OWNER, pattern=OWNER_SLUG_PATTERN)) -> str:
+    """Owner slug scoping the request; defaults to the deployment's own portfolio"""
+    return owner
+
+async def update_view(collection, documents):
+    """Patch the portfolio view after an insert; the write itself has already succeeded"""
+    try:
+        await apply_inserts(collection, documents)
+        if snapshot_store.enabled:
+            for owner in {document["owner"] for document in documents}:
+                await snapshot_store.replace(owner)
+    except Exception as e:
+        owners = sorted({document["owner"] for document in documents})
+        logger.error("Error updating portfolio view for %s, view may be stale until rebuilt "
+                     "(python portfolio_view.py --rebuild <owner>): %s", owners, e,
+                     extra={"alert": "portfolio_view_stale", "owners": owners})
+
+write_queue.add_persist_hook(update_view)
+
+async def persist(collection, model):
+    """Insert a new document, or enqueue it and answer 202 when write-behind is enabled"""
+    if not write_queue.enabled:
+        document = model.dict()
+        await collection.insert_one(document)
+        await update_view(collection, [document])
+        return model
+    try:
+        await write_queue.enqueue(collection, model.dict())
+    except WriteQueueFullError:
+        raise HTTPException(status_code=503, detail="Write queue is full", headers={"Retry-After": "1"})
+    except WriteQueueClosedError:
+        raise HTTPException(status_code=503, detail="Server is shutting down")
+    return JSONResponse(status_code=202, content={"id": model.id, "status": "queued"})
+
+def stale_headers(age):
+    return {"X-Data-Stale": "true", "Age": str(int(age)), "Warning": '110 - "Response is Stale"'}
+
+async def guarded_read(response, route, owner, read, cacheable=bool):
+    """Run a read through the database breaker, serving the last-known-good result when it fails.
+
+    Only results for which ``cacheable(result)`` is true are kept as last
+    known good; empty and not-found results are not, so requests for
+    arbitrary owner slugs cannot push real owners out of the cache.
+    """
+    try:
+        result = await db_breaker.call(read)
+    except Exception as e:
+        cached = last_known_good.get(route, owner)
+        if cached is None:
+            if isinstance(e, CircuitOpenError):
+                raise HTTPException(status_code=503, detail="Database unavailable", headers={"Retry-After": "5"})
+            raise
+        age, result = cached
+        logger.warning("Serving stale %s for '%s' (%.0fs old): %r", route, owner, age, e)
+        response.headers.update(stale_headers(age))
+        return result
+    if cacheable(result):
+        last_known_good.put(route, owner, result)
+    return result
+
+def remember_snapshot_view(owner, view):
+    """Keep the reads a snapshot serves as last known good, since they bypass guarded_read"""
+    if view.get("profile"):
+        last_known_good.put("profile", owner, view["profile"])
+    for section in SECTIONS:
+        if view.get(section):
+            last_known_good.put(section, owner, view[section])
+
+snapshot_store.add_build_hook(remember_snapshot_view)
+
+async def snapshot_response(owner, section):
+    """Serve a read route straight from the in-process snapshot, or None to read from Mongo.
+
+    When the snapshot has expired and cannot be rebuilt, the expired one is
+    served with the same stale headers as the last-known-good fallback.
+    """
+    if not snapshot_store.enabled:
+        return None
+    headers = None
+    snapshot = snapshot_store.cached(owner)
+    if snapshot is None:
+        try:
+            snapshot = await db_breaker.call(lambda: snapshot_store.get(owner))
+        except Exception as e:
+            snapshot = snapshot_store.held(owner)
+            if snapshot is None:
+                logger.warning("Portfolio snapshot unavailable for '%s': %r", owner, e)
+                return None
+            logger.warning("Serving stale snapshot for '%s' (%.0fs old): %r", owner, snapshot.age, e)
+            headers = stale_headers(snapshot.age)
+    body = snapshot.profile_json() if section == "profile" else snapshot.section_json(section)
+    if body is None:
+        return None
+    return Response(content=body, media_type="application/json", headers=headers)
+
 # Profile routes
 @router.get("/profile", response_model=Profile)
-async def get_profile():
+async def get_profile(response: Response, owner: str = Depends(get_owner)):
     try:
-        profile = await profiles_collection.find_one()
+        cached = await snapshot_response(owner, "profile")
+        if cached:
+            return cached
+        profile = await guarded_read(response, "profile", owner, lambda: profiles_collection.find_one({"owner": owner}, {"_id": 0}))
         if not profile:
             raise HTTPException(status_code=404, detail="Profile not found")
         return Profile(**profile)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error getting profile: {e}")
+        logger.error("Error getting profile: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/profile", response_model=Profile)
-async def create_profile(profile_data: ProfileCreate):
+async def create_profile(profile_data: ProfileCreate, owner: str = Depends(get_owner)):
     try:
-        profile = Profile(**profile_data.dict())
-        await profiles_collection.insert_one(profile.dict())
-        return profile
+        profile = Profile(**profile_data.dict(), owner=owner)
+        return await persist(profiles_collection, profile)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error creating profile: {e}")
+        logger.error("Error creating profile: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Project routes
 @router.get("/projects", response_model=List[Project])
-async def get_projects():
+async def get_projects(response: Response, owner: str = Depends(get_owner)):
     try:
-        projects = await projects_collection.find().sort("created_at", -1).to_list(100)
+        cached = await snapshot_response(owner, "projects")
+        if cached:
+            return cached
+        projects = await guarded_read(
+            response, "projects", owner,
+            lambda: projects_collection.find({"owner": owner}, {"_id": 0}).sort(CREATED_DESC).to_list(100)
+        )
         return [Project(**project) for project in projects]
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error getting projects: {e}")
+        logger.error("Error getting projects: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/projects", response_model=Project)
-async def create_project(project_data: ProjectCreate):
+async def create_project(project_data: ProjectCreate, owner: str = Depends(get_owner)):
     try:
-        project = Project(**project_data.dict())
-        await projects_collection.insert_one(project.dict())
-        return project
+        project = Project(**project_data.dict(), owner=owner)
+        return await persist(projects_collection, project)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error creating project: {e}")
+        logger.error("Error creating project: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Skills routes
 @router.get("/skills", response_model=List[SkillCategory])
-async def get_skills():
+async def get_skills(response: Response, owner: str = Depends(get_owner)):
     try:
-        skills = await skills_collection.find().sort("category", 1).to_list(100)
+        cached = await snapshot_response(owner, "skills")
+        if cached:
+            return cached
+        skills = await guarded_read(
+            response, "skills", owner,
+            lambda: skills_collection.find({"owner": owner}, {"_id": 0}).sort(CATEGORY_ASC).to_list(100)
+        )
         return [SkillCategory(**skill) for skill in skills]
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error getting skills: {e}")
+        logger.error("Error getting skills: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/skills", response_model=SkillCategory)
-async def create_skill_category(skill_data: SkillCategoryCreate):
+async def create_skill_category(skill_data: SkillCategoryCreate, owner: str = Depends(get_owner)):
     try:
-        skill_category = SkillCategory(**skill_data.dict())
-        await skills_collection.insert_one(skill_category.dict())
-        return skill_category
+        skill_category = SkillCategory(**skill_data.dict(), owner=owner)
+        return await persist(skills_collection, skill_category)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error creating skill category: {e}")
+        logger.error("Error creating skill category: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Achievements routes
 @router.get("/achievements", response_model=List[Achievement])
-async def get_achievements():
+async def get_achievements(response: Response, owner: str = Depends(get_owner)):
     try:
-        achievements = await achievements_collection.find().sort("created_at", -1).to_list(100)
+        cached = await snapshot_response(owner, "achievements")
+        if cached:
+            return cached
+        achievements = await guarded_read(
+            response, "achievements", owner,
+            lambda: achievements_collection.find({"owner": owner}, {"_id": 0}).sort(CREATED_DESC).to_list(100)
+        )
         return [Achievement(**achievement) for achievement in achievements]
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error getting achievements: {e}")
+        logger.error("Error getting achievements: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/achievements", response_model=Achievement)
-async def create_achievement(achievement_data: AchievementCreate):
+async def create_achievement(achievement_data: AchievementCreate, owner: str = Depends(get_owner)):
     try:
-        achievement = Achievement(**achievement_data.dict())
-        await achievements_collection.insert_one(achievement.dict())
-        return achievement
+        achievement = Achievement(**achievement_data.dict(), owner=owner)
+        return await persist(achievements_collection, achievement)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error creating achievement: {e}")
+        logger.error("Error creating achievement: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Certifications routes
 @router.get("/certifications", response_model=List[Certification])
-async def get_certifications():
+async def get_certifications(response: Response, owner: str = Depends(get_owner)):
     try:
-        certifications = await certifications_collection.find().sort("created_at", -1).to_list(100)
+        cached = await snapshot_response(owner, "certifications")
+        if cached:
+            return cached
+        certifications = await guarded_read(
+            response, "certifications", owner,
+            lambda: certifications_collection.find({"owner": owner}, {"_id": 0}).sort(CREATED_DESC).to_list(100)
+        )
         return [Certification(**certification) for certification in certifications]
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error getting certifications: {e}")
+        logger.error("Error getting certifications: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.post("/certifications", response_model=Certification)
-async def create_certification(certification_data: CertificationCreate):
+async def create_certification(certification_data: CertificationCreate, owner: str = Depends(get_owner)):
     try:
-        certification = Certification(**certification_data.dict())
-        await certifications_collection.insert_one(certification.dict())
-        return certification
+        certification = Certification(**certification_data.dict(), owner=owner)
+        return await persist(certifications_collection, certification)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error creating certification: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        logger.error("Error creating certification: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+# Portfolio view route
+@router.get("/view", response_model=PortfolioView)
+async def get_portfolio_view(response: Response, owner: str = Depends(get_owner)):
+    try:
+        view = await guarded_read(response, "view", owner, lambda: get_view(owner), cacheable=lambda view: view["version"])
+        return PortfolioView(**view)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error getting portfolio view: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+# Delta sync route
+@router.get("/changes", response_model=ChangesPage)
+async def get_changes(
+    owner: str = Depends(get_owner),
+    since: Optional[datetime] = None,
+    token: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+):
+    """Documents created, updated or deleted after ``since`` or the position in ``token``.
+
+    Positions older than the tombstone retention window get 410 Gone: deletes
+    from before then are no longer recorded, so the client must resync.
+    """
+    try:
+        if token:
+            position = decode_token(token)
+        elif since:
+            # Stored timestamps are naive UTC
+            if since.tzinfo:
+                since = since.astimezone(timezone.utc).replace(tzinfo=None)
+            position = (since, None, None)
+        else:
+            position = None
+        check_retention(position)
+        changes, next_token, has_more = await db_breaker.call(lambda: load_changes(owner, position, limit))
+        return ChangesPage(changes=changes, next_token=next_token, has_more=has_more)
+    except InvalidTokenError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ResyncRequiredError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except CircuitOpenError:
+        raise HTTPException(status_code=503, detail="Database unavailable", headers={"Retry-After": "5"})
+    except Exception as e:
+        logger.error("Error getting changes: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+# Write-behind status
+@router.get("/writes/{document_id}")
+async def get_write_status(document_id: str, owner: str = Depends(get_owner)):
+    try:
+        status = await write_queue.status(document_id, WRITE_COLLECTIONS, {"owner": owner})
+    except Exception as e:
+        logger.error("Error getting write status: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown write id")
+    return {"id": document_id, "status": status}
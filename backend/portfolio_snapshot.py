@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime
+from json.encoder import encode_basestring
+
+from portfolio_view import get_view
+
+logger = logging.getLogger(__name__)
+
+
+class _Record:
+    """Immutable slotted record; field order matches the API model's JSON output.
+
+    Strings in INTERNED fields are interned with sys.intern, so vocabulary
+    shared across records and owners (a technology such as "Java", a skill
+    category, an owner slug) is stored once per process. Ids, timestamps and
+    free text are unique per record and kept as they are.
+    """
+
+    __slots__ = ()
+    NESTED = {}
+    INTERNED = frozenset()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @classmethod
+    def from_document(cls, document):
+        values = []
+        for name in cls.__slots__:
+            value = document.get(name)
+            if name in cls.NESTED:
+                value = cls.NESTED[name].from_document(value or {})
+            elif isinstance(value, list):
+                value = tuple(_intern(item) for item in value) if name in cls.INTERNED else tuple(value)
+            elif name in cls.INTERNED:
+                value = _intern(value)
+            values.append(value)
+        return cls(*values)
+
+    def to_json(self):
+        parts = []
+        for name in self.__slots__:
+            parts.append(f"{encode_basestring(name)}:{_encode(getattr(self, name))}")
+        return "{" + ",".join(parts) + "}"
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _encode(value):
+    if isinstance(value, str):
+        return encode_basestring(value)
+    if isinstance(value, _Record):
+        return value.to_json()
+    if isinstance(value, tuple):
+        return "[" + ",".join(_encode(item) for item in value) + "]"
+    if isinstance(value, datetime):
+        return f'"{value.isoformat()}"'
+    if value is None:
+        return "null"
+    return str(value)
+
+
+class ContactRecord(_Record):
+    __slots__ = ("email", "phone", "linkedin")
+
+
+class EducationRecord(_Record):
+    __slots__ = ("degree", "university", "period")
+
+
+class ProfileRecord(_Record):
+    __slots__ = ("id", "owner", "about", "contact", "education", "created_at", "updated_at")
+    NESTED = {"contact": ContactRecord, "education": EducationRecord}
+    INTERNED = frozenset({"owner"})
+
+
+class ProjectRecord(_Record):
+    __slots__ = ("id", "owner", "title", "description", "highlights", "technologies", "created_at", "updated_at")
+    INTERNED = frozenset({"owner", "technologies"})
+
+
+class SkillCategoryRecord(_Record):
+    __slots__ = ("id", "owner", "category", "items", "created_at", "updated_at")
+    INTERNED = frozenset({"owner", "category", "items"})
+
+
+class AchievementRecord(_Record):
+    __slots__ = ("id", "owner", "title", "description", "created_at", "updated_at")
+    INTERNED = frozenset({"owner"})
+
+
+class CertificationRecord(_Record):
+    __slots__ = ("id", "owner", "name", "issuer", "created_at", "updated_at")
+    INTERNED = frozenset({"owner", "issuer"})
+
+
+SECTION_RECORDS = {
+    "projects": ProjectRecord,
+    "skills": SkillCategoryRecord,
+    "achievements": AchievementRecord,
+    "certifications": CertificationRecord,
+}
+
+
+class PortfolioSnapshot:
+    """Immutable in-process copy of one owner's portfolio view.
+
+    Vocabulary strings are interned process-wide (see _Record), so they are
+    shared by every snapshot instead of copied into each. Section JSON is
+    rendered straight from the records on first use and then reused until the
+    snapshot is replaced. Like the view it is built from, each section holds
+    at most VIEW_SECTION_LIMIT records.
+    """
+
+    __slots__ = ("owner", "version", "built_at", "profile", "sections", "_json")
+
+    def __init__(self, view):
+        self.owner = view["owner"]
+        self.version = view.get("version")
+        self.built_at = time.monotonic()
+        self.profile = ProfileRecord.from_document(view["profile"]) if view.get("profile") else None
+        self.sections = {
+            section: tuple(record.from_document(document) for document in view.get(section, []))
+            for section, record in SECTION_RECORDS.items()
+        }
+        self._json = {}
+
+    @property
+    def age(self):
+        """Seconds since the snapshot was built"""
+        return time.monotonic() - self.built_at
+
+    def profile_json(self):
+        """JSON body for the profile route, or None when the owner has no profile"""
+        return self.profile.to_json().encode() if self.profile else None
+
+    def section_json(self, section, limit=100):
+        """JSON array body of the first ``limit`` records of a section"""
+        key = (section, limit)
+        if key not in self._json:
+            records = self.sections[section][:limit]
+            self._json[key] = ("[" + ",".join(record.to_json() for record in records) + "]").encode()
+        return self._json[key]
+
+
+class SnapshotStore:
+    """Per-owner PortfolioSnapshot cache.
+
+    A new snapshot is built from the portfolio view and swapped in with a
+    single assignment, so readers keep whichever snapshot they already hold.
+    Snapshots are rebuilt after local writes and after ttl seconds, which
+    bounds staleness for writes made through other workers. An expired
+    snapshot stays held until it is replaced, so it can still be served as
+    stale data when the rebuild fails.
+    """
+
+    def __init__(self, enabled=False, ttl=5.0, max_owners=1000):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_owners = max_owners
+        self._snapshots = OrderedDict()
+        self._building = {}
+        # Bumped per owner by replace(); a build started under an older value is not kept
+        self._generations = {}
+        self._build_hooks = []
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.environ.get("PORTFOLIO_SNAPSHOT_ENABLED", "false").lower() in ("1", "true", "yes"),
+            ttl=int(os.environ.get("PORTFOLIO_SNAPSHOT_TTL_MS", "5000")) / 1000,
+            max_owners=int(os.environ.get("PORTFOLIO_SNAPSHOT_MAX_OWNERS", "1000")),
+        )
+
+    def add_build_hook(self, hook):
+        """Register ``hook(owner, view)``, called with the view each new snapshot is built from"""
+        self._build_hooks.append(hook)
+
+    def held(self, owner):
+        """The owner's last snapshot regardless of age, or None"""
+        return self._snapshots.get(owner)
+
+    def cached(self, owner):
+        """The owner's snapshot if one younger than ttl is held, else None"""
+        snapshot = self._snapshots.get(owner)
+        if snapshot is None or time.monotonic() - snapshot.built_at >= self.ttl:
+            return None
+        self._snapshots.move_to_end(owner)
+        return snapshot
+
+    async def get(self, owner):
+        return self.cached(owner) or await self._refresh(owner)
+
+    async def replace(self, owner):
+        """Rebuild the owner's snapshot after a write, discarding the owner's builds that started before it"""
+        self._generations[owner] = self._generations.get(owner, 0) + 1
+        self._building.pop(owner, None)
+        self._snapshots.pop(owner, None)
+        await self._refresh(owner)
+
+    async def _refresh(self, owner):
+        """Build a snapshot and swap it in; concurrent callers share one build"""
+        building = self._building.get(owner)
+        if building is None:
+            building = asyncio.ensure_future(self._build(owner, self._generations.get(owner, 0)))
+            self._building[owner] = building
+            building.add_done_callback(lambda task: self._building.get(owner) is task and self._building.pop(owner))
+        return await asyncio.shield(building)
+
+    async def _build(self, owner, generation):
+        view = await get_view(owner)
+        snapshot = PortfolioSnapshot(view)
+        for hook in self._build_hooks:
+            try:
+                hook(owner, view)
+            except Exception as e:
+                logger.error("Portfolio snapshot build hook failed: %s", e)
+        if generation == self._generations.get(owner, 0):
+            self._snapshots[owner] = snapshot
+            self._snapshots.move_to_end(owner)
+            while len(self._snapshots) > self.max_owners:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+
+snapshot_store = SnapshotStore.from_env()
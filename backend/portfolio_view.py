@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+import sys
+from datetime import datetime
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from database import (
+    profiles_collection, projects_collection, skills_collection,
+    achievements_collection, certifications_collection, portfolio_views_collection,
+    DEFAULT_OWNER
+)
+
+logger = logging.getLogger(__name__)
+
+# Section name -> (source collection, sort spec used by the matching GET route)
+SECTIONS = {
+    "projects": (projects_collection, [("created_at", -1)]),
+    "skills": (skills_collection, [("category", 1)]),
+    "achievements": (achievements_collection, [("created_at", -1)]),
+    "certifications": (certifications_collection, [("created_at", -1)]),
+}
+
+# Records kept per section, matching the GET routes' to_list(100). This keeps the
+# view document far below MongoDB's 16 MB document limit for any owner.
+VIEW_SECTION_LIMIT = 100
+
+# Attempts build_view makes before giving up when concurrent writes keep moving the version
+BUILD_ATTEMPTS = 3
+
+SECTION_BY_COLLECTION = {
+    profiles_collection.name: "profile",
+    **{collection.name: section for section, (collection, _) in SECTIONS.items()},
+}
+
+
+async def load_sources(owner):
+    """Read the owner's profile and every sorted section straight from the source collections"""
+    profile = await profiles_collection.find_one({"owner": owner}, {"_id": 0})
+    sections = {}
+    for section, (collection, sort) in SECTIONS.items():
+        sections[section] = await collection.find({"owner": owner}, {"_id": 0}).sort(sort).limit(VIEW_SECTION_LIMIT).to_list(None)
+    return {"profile": profile, **sections}
+
+
+async def build_view(owner=DEFAULT_OWNER):
+    """Rebuild the owner's portfolio view document from the source collections.
+
+    Returns the stored view, or None for an owner with no documents at all:
+    no view is persisted for those, so requests for arbitrary owner slugs
+    cannot create documents.
+
+    The rebuild only replaces the view if its version has not moved since the
+    view was read, so an insert patched in while the sources were loading is
+    not overwritten; the rebuild is then retried with the newer sources.
+    """
+    for _ in range(BUILD_ATTEMPTS):
+        current = await portfolio_views_collection.find_one({"_id": owner}, {"version": 1})
+        sources = await load_sources(owner)
+        if current is None and not any(sources.values()):
+            return None
+        try:
+            view = await portfolio_views_collection.find_one_and_update(
+                {"_id": owner, "version": current.get("version") if current else {"$exists": False}},
+                {"$set": {"owner": owner, **sources, "updated_at": datetime.utcnow()}, "$inc": {"version": 1}},
+                upsert=current is None,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Another writer created the view after it was read
+            continue
+        if view is not None:
+            logger.info("Portfolio view for '%s' rebuilt", owner)
+            return view
+    logger.warning("Portfolio view for '%s' not rebuilt: it changed during %s attempts", owner, BUILD_ATTEMPTS)
+    return await portfolio_views_collection.find_one({"_id": owner})
+
+
+async def apply_inserts(collection, documents):
+    """Patch the owners' views with newly inserted documents from a source collection"""
+    section = SECTION_BY_COLLECTION.get(collection.name)
+    if section is None:
+        return
+
+    by_owner = {}
+    for document in documents:
+        by_owner.setdefault(document["owner"], []).append({k: v for k, v in document.items() if k != "_id"})
+
+    for owner, owner_documents in by_owner.items():
+        if section == "profile":
+            await build_view(owner)
+            continue
+
+        _, sort = SECTIONS[section]
+        result = await portfolio_views_collection.update_one(
+            {"_id": owner},
+            {
+                "$push": {section: {"$each": owner_documents, "$sort": dict(sort), "$slice": VIEW_SECTION_LIMIT}},
+                "$set": {"updated_at": datetime.utcnow()},
+                "$inc": {"version": 1},
+            },
+        )
+        if result.matched_count == 0:
+            await build_view(owner)
+
+
+def empty_view(owner):
+    """Transient view for an owner with no documents; never stored"""
+    return {"_id": owner, "owner": owner, "version": 0, "profile": None, "updated_at": datetime.utcnow(),
+            **{section: [] for section in SECTIONS}}
+
+
+async def get_view(owner=DEFAULT_OWNER):
+    """Return the owner's view document, building it first if it does not exist yet"""
+    view = await portfolio_views_collection.find_one({"_id": owner})
+    if view is None:
+        view = await build_view(owner) or empty_view(owner)
+    return view
+
+
+async def check_view_consistency(owner=DEFAULT_OWNER):
+    """Compare the view against the source collections.
+
+    Each section is checked for missing, unexpected and changed documents and
+    for being ordered by its route's sort key; ties may be ordered differently
+    from the source query, so exact positions are not compared (and a section
+    longer than VIEW_SECTION_LIMIT may keep a different record at a tied
+    cut-off).
+    """
+    view = await portfolio_views_collection.find_one({"_id": owner})
+    if view is None:
+        return {"owner": owner, "consistent": False, "version": None, "differences": {"view": "missing"}}
+
+    sources = await load_sources(owner)
+    differences = {}
+
+    if view.get("profile") != sources["profile"]:
+        differences["profile"] = "changed"
+
+    for section, (_, sort) in SECTIONS.items():
+        expected = {document["id"]: document for document in sources[section]}
+        actual = {document["id"]: document for document in view.get(section, [])}
+        section_diff = {}
+
+        missing = sorted(expected.keys() - actual.keys())
+        unexpected = sorted(actual.keys() - expected.keys())
+        changed = sorted(i for i in expected.keys() & actual.keys() if expected[i] != actual[i])
+        if missing:
+            section_diff["missing"] = missing
+        if unexpected:
+            section_diff["unexpected"] = unexpected
+        if changed:
+            section_diff["changed"] = changed
+
+        field, direction = sort[0]
+        values = [document.get(field) for document in view.get(section, [])]
+        ordered = values == sorted(values, reverse=direction < 0)
+        if not ordered:
+            section_diff["out_of_order"] = True
+
+        if section_diff:
+            differences[section] = section_diff
+
+    return {
+        "owner": owner,
+        "consistent": not differences,
+        "version": view.get("version"),
+        "differences": differences,
+    }
+
+
+async def main(argv):
+    owner = next((arg for arg in argv if not arg.startswith("--")), DEFAULT_OWNER)
+    if "--rebuild" in argv:
+        await build_view(owner)
+    report = await check_view_consistency(owner)
+    print(json.dumps(report, indent=2, default=str))
+    return 0 if report["consistent"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(sys.argv[1:])))
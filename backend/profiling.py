@@ -0,0 +1,149 @@
+import asyncio
+import hmac
+import itertools
+import logging
+import os
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TOKEN_HEADER = "x-profile-token"
+PROFILED_STATUS_HEADER = "X-Profiled-Status"
+PROFILE_REPORT_HEADER = "X-Profile-Report"
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles single requests end to end.
+
+    A request carrying the admin token in ``X-Profile-Token`` is profiled and
+    answered with a speedscope (flame graph) report instead of its normal
+    body. With a sample rate of N, every Nth request is profiled as well and
+    its report is written to a rotating directory.
+    """
+
+    def __init__(self, app, token=None, sample_rate=0, report_dir="profiles", max_reports=50):
+        self.app = app
+        self.token = token.encode() if token else None
+        self.sample_rate = sample_rate
+        self.report_dir = Path(report_dir)
+        self.max_reports = max_reports
+        self._counter = itertools.count(1)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self._has_token(scope):
+            await self._profile_inline(scope, receive, send)
+        elif self.sample_rate and next(self._counter) % self.sample_rate == 0:
+            await self._profile_sampled(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    def _has_token(self, scope):
+        if not self.token:
+            return False
+        for name, value in scope["headers"]:
+            if name == PROFILE_TOKEN_HEADER.encode():
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    async def _profile_inline(self, scope, receive, send):
+        """Profile the request and return the report as the response body"""
+        status = 500
+
+        async def discard(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        profiler = _start_profiler()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        report = await asyncio.to_thread(_render, profiler)
+        filename = await asyncio.to_thread(self._store, scope, report)
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(report)).encode()),
+                (PROFILED_STATUS_HEADER.encode(), str(status).encode()),
+                (PROFILE_REPORT_HEADER.encode(), filename.encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": report})
+
+    async def _profile_sampled(self, scope, receive, send):
+        """Profile the request and store the report, leaving the response untouched"""
+        profiler = _start_profiler()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            try:
+                report = await asyncio.to_thread(_render, profiler)
+                await asyncio.to_thread(self._store, scope, report)
+            except Exception as e:
+                logger.error("Failed to store sampled profile: %s", e)
+
+    def _store(self, scope, report):
+        """Write a report into the report directory, dropping the oldest beyond max_reports"""
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        route = scope["path"].strip("/").replace("/", "_") or "root"
+        filename = f"{time.strftime('%Y%m%dT%H%M%S')}-{time.monotonic_ns()}-{scope['method']}-{route}.speedscope.json"
+        (self.report_dir / filename).write_bytes(report)
+
+        reports = sorted(self.report_dir.glob("*.speedscope.json"), key=lambda p: p.stat().st_mtime)
+        for old in reports[:-self.max_reports]:
+            old.unlink(missing_ok=True)
+        return filename
+
+
+def _start_profiler():
+    from pyinstrument import Profiler
+
+    profiler = Profiler(interval=0.0005, async_mode="enabled")
+    profiler.start()
+    return profiler
+
+
+def _render(profiler):
+    from pyinstrument.renderers import SpeedscopeRenderer
+
+    return profiler.output(SpeedscopeRenderer()).encode()
+
+
+def install_profiling(app):
+    """Add ProfilingMiddleware to the app when profiling is configured.
+
+    Nothing is installed unless PROFILING_TOKEN or PROFILING_SAMPLE_RATE is
+    set, so the default request path carries no profiling overhead. A
+    relative PROFILING_DIR is resolved against the backend directory, not the
+    process working directory.
+    """
+    token = os.environ.get("PROFILING_TOKEN")
+    sample_rate = int(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+    if not token and not sample_rate:
+        return False
+
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        logger.warning("Profiling is configured but pyinstrument is not installed; profiling disabled")
+        return False
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        token=token,
+        sample_rate=sample_rate,
+        report_dir=Path(__file__).parent / os.environ.get("PROFILING_DIR", "profiles"),
+        max_reports=int(os.environ.get("PROFILING_MAX_REPORTS", "50")),
+    )
+    logger.info("Request profiling enabled (token: %s, sample rate: 1/%s)", 'set' if token else 'unset', sample_rate or '-')
+    return True
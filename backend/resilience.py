@@ -0,0 +1,171 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the database while the breaker is open"""
+
+
+class CircuitBreaker:
+    """Circuit breaker with a per-call deadline.
+
+    After failure_threshold consecutive failures (driver errors or deadline
+    misses) the breaker opens and calls fail immediately with
+    CircuitOpenError. Once reset_timeout has passed a single trial call is let
+    through; its outcome closes the breaker again or re-opens it. Any other
+    exception is raised without counting as a failure, so a bug or a request
+    error cannot take the database offline.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=10.0, call_timeout=2.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.call_timeout = call_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            failure_threshold=int(os.environ.get("MONGO_BREAKER_FAILURES", "5")),
+            reset_timeout=int(os.environ.get("MONGO_BREAKER_RESET_MS", "10000")) / 1000,
+            call_timeout=int(os.environ.get("MONGO_OP_TIMEOUT_MS", "2000")) / 1000,
+        )
+
+    async def call(self, operation):
+        """Await ``operation()`` within call_timeout, subject to the breaker state"""
+        trial = False
+        if self.state != CLOSED:
+            if self._trial_running or time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError("Database circuit breaker is open")
+            self.state = HALF_OPEN
+            self._trial_running = trial = True
+
+        try:
+            result = await asyncio.wait_for(operation(), self.call_timeout)
+        except (PyMongoError, asyncio.TimeoutError):
+            self._record_failure()
+            raise
+        finally:
+            if trial:
+                self._trial_running = False
+
+        self.state = CLOSED
+        self.failures = 0
+        return result
+
+    def _record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.error("Database circuit breaker opened after %s failures", self.failures)
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "open_for_s": round(time.monotonic() - self.opened_at, 1) if self.state != CLOSED else None,
+        }
+
+
+class LastKnownGood:
+    """Last successful result of each read, persisted to a local JSON file.
+
+    Entries are keyed by route and owner and kept in LRU order up to
+    max_entries. An entry is replaced at most once per refresh_interval;
+    reads in between only touch its LRU position, so hot routes neither
+    compare payloads nor rewrite the file. Replaced entries are written to
+    disk at most once per save_delay seconds, off the event loop.
+    """
+
+    def __init__(self, path, max_entries=10000, save_delay=1.0, refresh_interval=30.0):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.save_delay = save_delay
+        self.refresh_interval = refresh_interval
+        self._entries = OrderedDict()
+        self._save_task = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            path=os.environ.get("LKG_SNAPSHOT_PATH", Path(__file__).parent / "lkg_snapshot.json"),
+            max_entries=int(os.environ.get("LKG_MAX_ENTRIES", "10000")),
+            refresh_interval=int(os.environ.get("LKG_REFRESH_MS", "30000")) / 1000,
+        )
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                for key, entry in json.load(f).items():
+                    self._entries[key] = (entry["stored_at"], entry["payload"])
+            logger.info("Loaded %s last-known-good entries from %s", len(self._entries), self.path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error("Failed to load last-known-good snapshot: %s", e)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, route, owner):
+        """(age in seconds, payload) of the last good result, or None"""
+        entry = self._entries.get(f"{route}:{owner}")
+        if entry is None:
+            return None
+        stored_at, payload = entry
+        return time.time() - stored_at, payload
+
+    def put(self, route, owner, payload):
+        key = f"{route}:{owner}"
+        previous = self._entries.get(key)
+        now = time.time()
+        if previous is not None and now - previous[0] < self.refresh_interval:
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = (now, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if self._save_task is None:
+            self._save_task = asyncio.create_task(self._save_later())
+
+    async def _save_later(self):
+        await asyncio.sleep(self.save_delay)
+        self._save_task = None
+        await self.save()
+
+    async def save(self):
+        entries = {key: {"stored_at": stored_at, "payload": payload} for key, (stored_at, payload) in self._entries.items()}
+        try:
+            await asyncio.to_thread(self._write, entries)
+        except Exception as e:
+            logger.error("Failed to save last-known-good snapshot: %s", e)
+
+    def _write(self, entries):
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(entries, f, default=lambda o: o.isoformat() if isinstance(o, datetime) else str(o))
+        os.replace(tmp, self.path)
+
+
+db_breaker = CircuitBreaker.from_env()
+last_known_good = LastKnownGood.from_env()
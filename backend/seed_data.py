@@ -1,8 +1,11 @@
 import asyncio
+import sys
 from database import (
     profiles_collection, projects_collection, skills_collection,
-    achievements_collection, certifications_collection, init_database
+    achievements_collection, certifications_collection, init_database, DEFAULT_OWNER
 )
+from portfolio_view import build_view
+from changes import delete_with_tombstones
 from models import Profile, Project, SkillCategory, Achievement, Certification
 import logging
 
@@ -110,83 +113,84 @@ MOCK_DATA = {
     ]
 }
 
-async def clear_collections():
-    """Clear all collections"""
+async def clear_collections(owner=DEFAULT_OWNER):
+    """Clear the owner's documents from all collections"""
     try:
-        await profiles_collection.delete_many({})
-        await projects_collection.delete_many({})
-        await skills_collection.delete_many({})
-        await achievements_collection.delete_many({})
-        await certifications_collection.delete_many({})
-        logger.info("All collections cleared")
+        await delete_with_tombstones(profiles_collection, {"owner": owner})
+        await delete_with_tombstones(projects_collection, {"owner": owner})
+        await delete_with_tombstones(skills_collection, {"owner": owner})
+        await delete_with_tombstones(achievements_collection, {"owner": owner})
+        await delete_with_tombstones(certifications_collection, {"owner": owner})
+        logger.info("All collections cleared for owner '%s'", owner)
     except Exception as e:
-        logger.error(f"Error clearing collections: {e}")
+        logger.error("Error clearing collections: %s", e)
         raise
 
-async def seed_profile():
+async def seed_profile(owner=DEFAULT_OWNER):
     """Seed profile data"""
     try:
-        profile = Profile(**MOCK_DATA["profile"])
+        profile = Profile(**MOCK_DATA["profile"], owner=owner)
         await profiles_collection.insert_one(profile.dict())
         logger.info("Profile seeded successfully")
     except Exception as e:
-        logger.error(f"Error seeding profile: {e}")
+        logger.error("Error seeding profile: %s", e)
         raise
 
-async def seed_projects():
+async def seed_projects(owner=DEFAULT_OWNER):
     """Seed projects data"""
     try:
-        projects = [Project(**project_data) for project_data in MOCK_DATA["projects"]]
+        projects = [Project(**project_data, owner=owner) for project_data in MOCK_DATA["projects"]]
         await projects_collection.insert_many([project.dict() for project in projects])
-        logger.info(f"Seeded {len(projects)} projects")
+        logger.info("Seeded %s projects", len(projects))
     except Exception as e:
-        logger.error(f"Error seeding projects: {e}")
+        logger.error("Error seeding projects: %s", e)
         raise
 
-async def seed_skills():
+async def seed_skills(owner=DEFAULT_OWNER):
     """Seed skills data"""
     try:
-        skills = [SkillCategory(**skill_data) for skill_data in MOCK_DATA["skills"]]
+        skills = [SkillCategory(**skill_data, owner=owner) for skill_data in MOCK_DATA["skills"]]
         await skills_collection.insert_many([skill.dict() for skill in skills])
-        logger.info(f"Seeded {len(skills)} skill categories")
+        logger.info("Seeded %s skill categories", len(skills))
     except Exception as e:
-        logger.error(f"Error seeding skills: {e}")
+        logger.error("Error seeding skills: %s", e)
         raise
 
-async def seed_achievements():
+async def seed_achievements(owner=DEFAULT_OWNER):
     """Seed achievements data"""
     try:
-        achievements = [Achievement(**achievement_data) for achievement_data in MOCK_DATA["achievements"]]
+        achievements = [Achievement(**achievement_data, owner=owner) for achievement_data in MOCK_DATA["achievements"]]
         await achievements_collection.insert_many([achievement.dict() for achievement in achievements])
-        logger.info(f"Seeded {len(achievements)} achievements")
+        logger.info("Seeded %s achievements", len(achievements))
     except Exception as e:
-        logger.error(f"Error seeding achievements: {e}")
+        logger.error("Error seeding achievements: %s", e)
         raise
 
-async def seed_certifications():
+async def seed_certifications(owner=DEFAULT_OWNER):
     """Seed certifications data"""
     try:
-        certifications = [Certification(**cert_data) for cert_data in MOCK_DATA["certifications"]]
+        certifications = [Certification(**cert_data, owner=owner) for cert_data in MOCK_DATA["certifications"]]
         await certifications_collection.insert_many([cert.dict() for cert in certifications])
-        logger.info(f"Seeded {len(certifications)} certifications")
+        logger.info("Seeded %s certifications", len(certifications))
     except Exception as e:
-        logger.error(f"Error seeding certifications: {e}")
+        logger.error("Error seeding certifications: %s", e)
         raise
 
-async def seed_database():
-    """Seed entire database"""
+async def seed_database(owner=DEFAULT_OWNER):
+    """Seed the owner's portfolio"""
     try:
         await init_database()
-        await clear_collections()
-        await seed_profile()
-        await seed_projects()
-        await seed_skills()
-        await seed_achievements()
-        await seed_certifications()
-        logger.info("Database seeded successfully")
+        await clear_collections(owner)
+        await seed_profile(owner)
+        await seed_projects(owner)
+        await seed_skills(owner)
+        await seed_achievements(owner)
+        await seed_certifications(owner)
+        await build_view(owner)
+        logger.info("Database seeded successfully for owner '%s'", owner)
     except Exception as e:
-        logger.error(f"Error seeding database: {e}")
+        logger.error("Error seeding database: %s", e)
         raise
 
 if __name__ == "__main__":
-    asyncio.run(seed_database())
\ No newline at end of file
+    asyncio.run(seed_database(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_OWNER))
\ No newline at end of file
@@ -1,36 +1,73 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
+from logging_config import configure_logging, adopt_uvicorn_loggers, install_access_log
 from database import init_database, close_database
 from portfolio_routes import router as portfolio_router
 from seed_data import seed_database
+from profiling import install_profiling
+from write_behind import write_queue
+from resilience import db_breaker, last_known_good
+from health import dependency_probe, DrainingServer, STARTING, READY, DRAINING
+import asyncio
 import os
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+async def warm_up(stopping, backoff=1.0, max_backoff=30.0):
+    """Seed an empty database, then report ready; runs once the server is accepting connections.
+
+    Failed attempts are retried with exponential backoff until one succeeds
+    or the server starts draining (``stopping`` is set).
+    """
+    while dependency_probe.lifecycle == STARTING:
+        try:
+            from database import profiles_collection
+            profile_count = await profiles_collection.count_documents({})
+            if profile_count == 0:
+                logger.info("Database is empty, seeding with initial data...")
+                await seed_database()
+            if dependency_probe.lifecycle == STARTING:
+                dependency_probe.lifecycle = READY
+                logger.info("Startup complete, ready for traffic")
+            return
+        except Exception as e:
+            logger.error("Startup warm-up failed, staying not ready and retrying in %.1fs: %s", backoff, e)
+        try:
+            await asyncio.wait_for(stopping.wait(), backoff)
+        except asyncio.TimeoutError:
+            pass
+        backoff = min(backoff * 2, max_backoff)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    adopt_uvicorn_loggers()
     logger.info("Starting up...")
+    last_known_good.load()
+    dependency_probe.start()
     await init_database()
-    
-    # Check if database is empty and seed if needed
-    from database import profiles_collection
-    profile_count = await profiles_collection.count_documents({})
-    if profile_count == 0:
-        logger.info("Database is empty, seeding with initial data...")
-        await seed_database()
+    await write_queue.start()
+
+    # Uvicorn only binds its socket after lifespan startup returns, so the
+    # seeding runs in the background while /ready reports "starting"
+    stopping = asyncio.Event()
+    warm_up_task = asyncio.create_task(warm_up(stopping))
     
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    dependency_probe.lifecycle = DRAINING
+    stopping.set()
+    await warm_up_task
+    await write_queue.stop()
+    await last_known_good.save()
+    await dependency_probe.stop()
     await close_database()
 
 # Create FastAPI app
@@ -50,15 +87,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Sampled structured access log (errors are always logged)
+install_access_log(app)
+
+# Opt-in request profiling (no-op unless PROFILING_TOKEN / PROFILING_SAMPLE_RATE is set)
+install_profiling(app)
+
 # Include routers
 app.include_router(portfolio_router)
 
 # Health check endpoint
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "message": "Portfolio API is running"}
+    breaker = db_breaker.snapshot()
+    if breaker["state"] != "closed":
+        return {"status": "degraded", "message": "Database unavailable, serving last-known-good data", "database": breaker}
+    return {"status": "healthy", "message": "Portfolio API is running", "database": breaker}
+
+# Liveness: the process and its event loop are running
+@app.get("/api/health/live")
+async def liveness():
+    return {"status": "alive"}
+
+# Readiness: cached dependency probe, never touches the database per request
+@app.get("/api/health/ready")
+async def readiness():
+    ready, details = dependency_probe.readiness()
+    return JSONResponse(status_code=200 if ready else 503, content=details)
 
 # Root endpoint
 @app.get("/api/")
 async def root():
-    return {"message": "Portfolio API - Ready to serve your professional journey!"}
\ No newline at end of file
+    return {"message": "Portfolio API - Ready to serve your professional journey!"}
+
+if __name__ == "__main__":
+    # Serve through DrainingServer so SIGTERM gets the readiness drain window
+    import uvicorn
+    config = uvicorn.Config(app, host=os.environ.get("HOST", "0.0.0.0"), port=int(os.environ.get("PORT", "8001")))
+    DrainingServer(config, dependency_probe).run()
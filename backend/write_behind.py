@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+PERSISTED = "persisted"
+FAILED = "failed"
+
+
+class WriteQueueFullError(Exception):
+    """Raised when a document cannot be enqueued before the enqueue timeout"""
+
+
+class WriteQueueClosedError(Exception):
+    """Raised when a document is enqueued after the queue has been stopped"""
+
+
+class WriteBehindQueue:
+    """Bounded write-behind queue that batches inserts into insert_many calls.
+
+    Documents are acknowledged as soon as they are enqueued and are flushed by
+    a single background task once batch_size documents are waiting or
+    flush_interval seconds have passed since the first one arrived. The queue
+    holds at most max_pending documents; producers wait up to enqueue_timeout
+    for room and are rejected after that. A flush that fails with a transient
+    error is retried up to max_retries times with exponential backoff before
+    its documents are marked failed.
+    """
+
+    def __init__(self, enabled=False, max_pending=10000, batch_size=500,
+                 flush_interval=0.05, enqueue_timeout=1.0, status_capacity=100000,
+                 max_retries=5, retry_backoff=0.1, max_retry_backoff=5.0):
+        self.enabled = enabled
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.status_capacity = status_capacity
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self._queue = None
+        self._task = None
+        self._closed = True
+        self._status = OrderedDict()
+        self._persist_hooks = []
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.environ.get("WRITE_BEHIND_ENABLED", "false").lower() in ("1", "true", "yes"),
+            max_pending=int(os.environ.get("WRITE_BEHIND_MAX_PENDING", "10000")),
+            batch_size=int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", "500")),
+            flush_interval=int(os.environ.get("WRITE_BEHIND_FLUSH_INTERVAL_MS", "50")) / 1000,
+            enqueue_timeout=int(os.environ.get("WRITE_BEHIND_ENQUEUE_TIMEOUT_MS", "1000")) / 1000,
+            max_retries=int(os.environ.get("WRITE_BEHIND_MAX_RETRIES", "5")),
+            retry_backoff=int(os.environ.get("WRITE_BEHIND_RETRY_BACKOFF_MS", "100")) / 1000,
+        )
+
+    def add_persist_hook(self, hook):
+        """Register ``async hook(collection, documents)``, awaited after each batch is inserted"""
+        self._persist_hooks.append(hook)
+
+    async def start(self):
+        if not self.enabled or self._task:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._closed = False
+        self._task = asyncio.create_task(self._run())
+        logger.info("Write-behind queue started (batch size %s, max pending %s)", self.batch_size, self.max_pending)
+
+    async def stop(self):
+        """Stop accepting documents and flush everything still queued"""
+        if not self._task:
+            return
+        self._closed = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        logger.info("Write-behind queue drained and stopped")
+
+    async def enqueue(self, collection, document):
+        if self._closed:
+            raise WriteQueueClosedError("Write-behind queue is not accepting writes")
+        self._set_status(document["id"], QUEUED)
+        try:
+            await asyncio.wait_for(self._queue.put((collection, document)), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            del self._status[document["id"]]
+            raise WriteQueueFullError(f"Write-behind queue is full ({self.max_pending} pending)")
+
+    async def status(self, document_id, collections, query=None):
+        """Status of a write id; ids no longer tracked here are looked up in collections.
+
+        That covers ids persisted by another worker, before a restart or since
+        evicted from the in-process status table. Returns None if unknown.
+        """
+        status = self._status.get(document_id)
+        if status is not None:
+            return status
+        for collection in collections:
+            if await collection.find_one({**(query or {}), "id": document_id}, {"_id": 1}):
+                return PERSISTED
+        return None
+
+    @property
+    def pending(self):
+        return self._queue.qsize() if self._queue else 0
+
+    def _set_status(self, document_id, status):
+        self._status[document_id] = status
+        self._status.move_to_end(document_id)
+        while len(self._status) > self.status_capacity:
+            oldest_id, oldest_status = next(iter(self._status.items()))
+            if oldest_status == QUEUED:
+                break
+            del self._status[oldest_id]
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch.append(item)
+
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                try:
+                    item = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self._queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        by_collection = {}
+        for collection, document in batch:
+            by_collection.setdefault(collection.name, (collection, []))[1].append(document)
+
+        for collection, documents in by_collection.values():
+            failed_ids = await self._insert_with_retry(collection, documents)
+
+            persisted = [document for document in documents if document["id"] not in failed_ids]
+            for hook in self._persist_hooks if persisted else []:
+                try:
+                    await hook(collection, persisted)
+                except Exception as e:
+                    logger.error("Write-behind persist hook failed: %s", e)
+
+            for document in documents:
+                self._set_status(document["id"], FAILED if document["id"] in failed_ids else PERSISTED)
+
+    async def _insert_with_retry(self, collection, documents):
+        """Insert documents, retrying transient errors with exponential backoff.
+
+        Per-document write errors are permanent and are not retried. Before a
+        retry, ids that did reach the collection are skipped so an attempt that
+        failed after partially succeeding is not inserted twice. Returns the
+        ids that could not be persisted.
+
+        updated_at is stamped right before every attempt, so documents that
+        only commit after a backoff are not dated behind change tokens handed
+        out while they waited (see SETTLE_WINDOW in changes.py).
+        """
+        pending = documents
+        failed_ids = set()
+        for attempt in range(self.max_retries + 1):
+            now = datetime.utcnow()
+            for document in pending:
+                document["updated_at"] = now
+            try:
+                await collection.insert_many(pending, ordered=False)
+                return failed_ids
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                failed_ids |= {pending[err["index"]]["id"] for err in errors}
+                logger.error("Write-behind flush to %s failed for %s documents: %s", collection.name, len(errors), e)
+                return failed_ids
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error("Write-behind flush to %s failed after %s attempts, dropping %s documents: %s",
+                                 collection.name, attempt + 1, len(pending), e)
+                    return failed_ids | {document["id"] for document in pending}
+                delay = min(self.retry_backoff * 2 ** attempt, self.max_retry_backoff)
+                logger.warning("Write-behind flush to %s failed (attempt %s), retrying in %.2fs: %s",
+                               collection.name, attempt + 1, delay, e)
+                await asyncio.sleep(delay)
+                pending = await self._not_persisted(collection, pending)
+                if not pending:
+                    return failed_ids
+
+    async def _not_persisted(self, collection, documents):
+        """The documents whose ids are not in the collection yet; all of them if that cannot be checked"""
+        try:
+            ids = [document["id"] for document in documents]
+            found = await collection.find({"owner": {"$in": list({document["owner"] for document in documents})},
+                                           "id": {"$in": ids}}, {"_id": 0, "id": 1}).to_list(None)
+        except Exception:
+            return documents
+        found_ids = {document["id"] for document in found}
+        return [document for document in documents if document["id"] not in found_ids]
+
+write_queue = WriteBehindQueue.from_env()
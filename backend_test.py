@@ -4,10 +4,14 @@ Comprehensive Backend API Testing for Portfolio Application
 Tests all portfolio backend APIs as specified in the review request.
 """
 
+import argparse
+import asyncio
+import math
 import requests
 import json
 import sys
 import os
+import time
 from datetime import datetime
 
 # Get backend URL from frontend .env file
@@ -29,6 +33,171 @@ if not BACKEND_URL:
 
 print(f"🔗 Testing backend at: {BACKEND_URL}")
 
+# Response validators shared by the sequential tests and the stress mode.
+# Each takes the decoded JSON body and returns (success, details).
+
+def validate_health(data):
+    if 'status' in data and data['status'] == 'healthy':
+        return True, f"Status: {data.get('status')}, Message: {data.get('message')}"
+    return False, f"Invalid response format: {data}"
+
+def validate_profile(data):
+    # Validate required fields
+    required_fields = ['id', 'about', 'contact', 'education', 'created_at', 'updated_at']
+    missing_fields = [field for field in required_fields if field not in data]
+    
+    if missing_fields:
+        return False, f"Missing required fields: {missing_fields}"
+    
+    # Validate contact info
+    contact = data.get('contact', {})
+    contact_fields = ['email', 'phone', 'linkedin']
+    missing_contact = [field for field in contact_fields if field not in contact]
+    
+    if missing_contact:
+        return False, f"Missing contact fields: {missing_contact}"
+    
+    # Validate education info
+    education = data.get('education', {})
+    education_fields = ['degree', 'university', 'period']
+    missing_education = [field for field in education_fields if field not in education]
+    
+    if missing_education:
+        return False, f"Missing education fields: {missing_education}"
+    
+    # Check if it's Riddhi Kalra's profile
+    about_text = data.get('about', '').lower()
+    if 'riddhi' not in about_text and 'tata technologies' not in about_text:
+        return False, "Profile doesn't match expected Riddhi Kalra data"
+    
+    return True, f"Profile loaded for: {contact.get('email', 'N/A')}"
+
+def find_expected(values, expected_values):
+    """Return the expected substrings that occur in at least one value"""
+    found = []
+    for expected in expected_values:
+        for value in values:
+            if expected in value:
+                found.append(expected)
+                break
+    return found
+
+def validate_projects(data):
+    if not isinstance(data, list):
+        return False, "Response is not a list"
+    
+    if len(data) == 0:
+        return False, "No projects found"
+    
+    # Validate project structure
+    for i, project in enumerate(data):
+        required_fields = ['id', 'title', 'description', 'highlights', 'technologies', 'created_at', 'updated_at']
+        missing_fields = [field for field in required_fields if field not in project]
+        
+        if missing_fields:
+            return False, f"Project {i} missing fields: {missing_fields}"
+        
+        if not isinstance(project['highlights'], list) or not isinstance(project['technologies'], list):
+            return False, f"Project {i} highlights/technologies not lists"
+    
+    # Check for expected projects
+    project_titles = [p['title'].lower() for p in data]
+    expected_projects = ['middleware api suite', 'microservices with spring boot', 'platform migration']
+    found_projects = find_expected(project_titles, expected_projects)
+    
+    if len(found_projects) < 2:  # At least 2 expected projects should be found
+        return False, f"Expected projects not found. Found: {found_projects}"
+    
+    return True, f"Found {len(data)} projects including expected ones: {found_projects}"
+
+def validate_skills(data):
+    if not isinstance(data, list):
+        return False, "Response is not a list"
+    
+    if len(data) == 0:
+        return False, "No skills found"
+    
+    # Validate skill category structure
+    for i, skill_category in enumerate(data):
+        required_fields = ['id', 'category', 'items', 'created_at', 'updated_at']
+        missing_fields = [field for field in required_fields if field not in skill_category]
+        
+        if missing_fields:
+            return False, f"Skill category {i} missing fields: {missing_fields}"
+        
+        if not isinstance(skill_category['items'], list):
+            return False, f"Skill category {i} items not a list"
+    
+    # Check for expected skill categories
+    categories = [s['category'].lower() for s in data]
+    expected_categories = ['programming', 'frameworks', 'tools']
+    found_categories = find_expected(categories, expected_categories)
+    
+    if len(found_categories) < 2:  # At least 2 expected categories should be found
+        return False, f"Expected skill categories not found. Found: {found_categories}"
+    
+    return True, f"Found {len(data)} skill categories including: {found_categories}"
+
+def validate_achievements(data):
+    if not isinstance(data, list):
+        return False, "Response is not a list"
+    
+    if len(data) == 0:
+        return False, "No achievements found"
+    
+    # Validate achievement structure
+    for i, achievement in enumerate(data):
+        required_fields = ['id', 'title', 'description', 'created_at', 'updated_at']
+        missing_fields = [field for field in required_fields if field not in achievement]
+        
+        if missing_fields:
+            return False, f"Achievement {i} missing fields: {missing_fields}"
+    
+    # Check for expected achievements
+    achievement_titles = [a['title'].lower() for a in data]
+    expected_achievements = ['champion', 'snowflake', 'integration']
+    found_achievements = find_expected(achievement_titles, expected_achievements)
+    
+    if len(found_achievements) < 2:  # At least 2 expected achievements should be found
+        return False, f"Expected achievements not found. Found: {found_achievements}"
+    
+    return True, f"Found {len(data)} achievements including: {found_achievements}"
+
+def validate_certifications(data):
+    if not isinstance(data, list):
+        return False, "Response is not a list"
+    
+    if len(data) == 0:
+        return False, "No certifications found"
+    
+    # Validate certification structure
+    for i, certification in enumerate(data):
+        required_fields = ['id', 'name', 'issuer', 'created_at', 'updated_at']
+        missing_fields = [field for field in required_fields if field not in certification]
+        
+        if missing_fields:
+            return False, f"Certification {i} missing fields: {missing_fields}"
+    
+    # Check for expected certifications
+    cert_names = [c['name'].lower() for c in data]
+    expected_certs = ['ui design', 'sql', 'cybersecurity']
+    found_certs = find_expected(cert_names, expected_certs)
+    
+    if len(found_certs) < 2:  # At least 2 expected certifications should be found
+        return False, f"Expected certifications not found. Found: {found_certs}"
+    
+    return True, f"Found {len(data)} certifications including: {found_certs}"
+
+# (test name, path, validator) for every read endpoint
+ENDPOINT_CHECKS = [
+    ("Health Check", "/api/health", validate_health),
+    ("Portfolio Profile", "/api/portfolio/profile", validate_profile),
+    ("Projects", "/api/portfolio/projects", validate_projects),
+    ("Skills", "/api/portfolio/skills", validate_skills),
+    ("Achievements", "/api/portfolio/achievements", validate_achievements),
+    ("Certifications", "/api/portfolio/certifications", validate_certifications),
+]
+
 class PortfolioAPITester:
     def __init__(self, base_url):
         self.base_url = base_url
@@ -49,290 +218,154 @@ class PortfolioAPITester:
             'timestamp': datetime.now().isoformat()
         })
     
-    def test_health_check(self):
-        """Test GET /api/health endpoint"""
+    def check_endpoint(self, test_name, path, validator):
+        """GET an endpoint and validate its JSON body"""
         try:
-            response = self.session.get(f"{self.base_url}/api/health", timeout=10)
+            response = self.session.get(f"{self.base_url}{path}", timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
-                if 'status' in data and data['status'] == 'healthy':
-                    self.log_test("Health Check", True, f"Status: {data.get('status')}, Message: {data.get('message')}")
-                    return True
-                else:
-                    self.log_test("Health Check", False, f"Invalid response format: {data}")
-                    return False
+                success, details = validator(response.json())
+                self.log_test(test_name, success, details)
+                return success
             else:
-                self.log_test("Health Check", False, f"HTTP {response.status_code}: {response.text}")
+                self.log_test(test_name, False, f"HTTP {response.status_code}: {response.text}")
                 return False
                 
         except Exception as e:
-            self.log_test("Health Check", False, f"Request failed: {str(e)}")
+            self.log_test(test_name, False, f"Request failed: {str(e)}")
             return False
     
+    def test_health_check(self):
+        """Test GET /api/health endpoint"""
+        return self.check_endpoint("Health Check", "/api/health", validate_health)
+    
     def test_portfolio_profile(self):
         """Test GET /api/portfolio/profile endpoint"""
-        try:
-            response = self.session.get(f"{self.base_url}/api/portfolio/profile", timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Validate required fields
-                required_fields = ['id', 'about', 'contact', 'education', 'created_at', 'updated_at']
-                missing_fields = [field for field in required_fields if field not in data]
-                
-                if missing_fields:
-                    self.log_test("Portfolio Profile", False, f"Missing required fields: {missing_fields}")
-                    return False
-                
-                # Validate contact info
-                contact = data.get('contact', {})
-                contact_fields = ['email', 'phone', 'linkedin']
-                missing_contact = [field for field in contact_fields if field not in contact]
-                
-                if missing_contact:
-                    self.log_test("Portfolio Profile", False, f"Missing contact fields: {missing_contact}")
-                    return False
-                
-                # Validate education info
-                education = data.get('education', {})
-                education_fields = ['degree', 'university', 'period']
-                missing_education = [field for field in education_fields if field not in education]
-                
-                if missing_education:
-                    self.log_test("Portfolio Profile", False, f"Missing education fields: {missing_education}")
-                    return False
-                
-                # Check if it's Riddhi Kalra's profile
-                about_text = data.get('about', '').lower()
-                if 'riddhi' not in about_text and 'tata technologies' not in about_text:
-                    self.log_test("Portfolio Profile", False, "Profile doesn't match expected Riddhi Kalra data")
-                    return False
-                
-                self.log_test("Portfolio Profile", True, f"Profile loaded for: {contact.get('email', 'N/A')}")
-                return True
-                
-            else:
-                self.log_test("Portfolio Profile", False, f"HTTP {response.status_code}: {response.text}")
-                return False
-                
-        except Exception as e:
-            self.log_test("Portfolio Profile", False, f"Request failed: {str(e)}")
-            return False
+        return self.check_endpoint("Portfolio Profile", "/api/portfolio/profile", validate_profile)
     
     def test_projects(self):
         """Test GET /api/portfolio/projects endpoint"""
-        try:
-            response = self.session.get(f"{self.base_url}/api/portfolio/projects", timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if not isinstance(data, list):
-                    self.log_test("Projects", False, "Response is not a list")
-                    return False
-                
-                if len(data) == 0:
-                    self.log_test("Projects", False, "No projects found")
-                    return False
-                
-                # Validate project structure
-                for i, project in enumerate(data):
-                    required_fields = ['id', 'title', 'description', 'highlights', 'technologies', 'created_at', 'updated_at']
-                    missing_fields = [field for field in required_fields if field not in project]
-                    
-                    if missing_fields:
-                        self.log_test("Projects", False, f"Project {i} missing fields: {missing_fields}")
-                        return False
-                    
-                    if not isinstance(project['highlights'], list) or not isinstance(project['technologies'], list):
-                        self.log_test("Projects", False, f"Project {i} highlights/technologies not lists")
-                        return False
-                
-                # Check for expected projects
-                project_titles = [p['title'].lower() for p in data]
-                expected_projects = ['middleware api suite', 'microservices with spring boot', 'platform migration']
-                
-                found_projects = []
-                for expected in expected_projects:
-                    for title in project_titles:
-                        if expected in title:
-                            found_projects.append(expected)
-                            break
-                
-                if len(found_projects) < 2:  # At least 2 expected projects should be found
-                    self.log_test("Projects", False, f"Expected projects not found. Found: {found_projects}")
-                    return False
-                
-                self.log_test("Projects", True, f"Found {len(data)} projects including expected ones: {found_projects}")
-                return True
-                
-            else:
-                self.log_test("Projects", False, f"HTTP {response.status_code}: {response.text}")
-                return False
-                
-        except Exception as e:
-            self.log_test("Projects", False, f"Request failed: {str(e)}")
-            return False
+        return self.check_endpoint("Projects", "/api/portfolio/projects", validate_projects)
     
     def test_skills(self):
         """Test GET /api/portfolio/skills endpoint"""
+        return self.check_endpoint("Skills", "/api/portfolio/skills", validate_skills)
+    
+    def test_achievements(self):
+        """Test GET /api/portfolio/achievements endpoint"""
+        return self.check_endpoint("Achievements", "/api/portfolio/achievements", validate_achievements)
+    
+    def test_certifications(self):
+        """Test GET /api/portfolio/certifications endpoint"""
+        return self.check_endpoint("Certifications", "/api/portfolio/certifications", validate_certifications)
+    
+    def test_portfolio_view(self):
+        """Test GET /api/portfolio/view endpoint"""
+        def validate_view(data):
+            missing = [field for field in ('owner', 'version', 'profile', 'projects', 'skills') if field not in data]
+            if missing:
+                return False, f"Missing view fields: {missing}"
+            success, details = validate_profile(data['profile'] or {})
+            if not success:
+                return False, f"View profile: {details}"
+            success, details = validate_projects(data['projects'])
+            if not success:
+                return False, f"View projects: {details}"
+            return True, f"View version {data['version']} with {len(data['projects'])} projects"
+        return self.check_endpoint("Portfolio View", "/api/portfolio/view", validate_view)
+
+    def test_changes_paging(self):
+        """Page through GET /api/portfolio/changes with resume tokens"""
         try:
-            response = self.session.get(f"{self.base_url}/api/portfolio/skills", timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if not isinstance(data, list):
-                    self.log_test("Skills", False, "Response is not a list")
+            seen = set()
+            last = None
+            token = None
+            for page in range(1000):
+                params = {'limit': 2, **({'token': token} if token else {})}
+                response = self.session.get(f"{self.base_url}/api/portfolio/changes", params=params, timeout=10)
+                if response.status_code != 200:
+                    self.log_test("Changes Paging", False, f"HTTP {response.status_code} on page {page}: {response.text}")
                     return False
-                
-                if len(data) == 0:
-                    self.log_test("Skills", False, "No skills found")
-                    return False
-                
-                # Validate skill category structure
-                for i, skill_category in enumerate(data):
-                    required_fields = ['id', 'category', 'items', 'created_at', 'updated_at']
-                    missing_fields = [field for field in required_fields if field not in skill_category]
-                    
-                    if missing_fields:
-                        self.log_test("Skills", False, f"Skill category {i} missing fields: {missing_fields}")
+                data = response.json()
+                for change in data['changes']:
+                    key = (change['collection'], change['id'], change['updated_at'])
+                    updated_at = datetime.fromisoformat(change['updated_at'])
+                    if key in seen:
+                        self.log_test("Changes Paging", False, f"Change returned twice: {key}")
                         return False
-                    
-                    if not isinstance(skill_category['items'], list):
-                        self.log_test("Skills", False, f"Skill category {i} items not a list")
+                    if last and updated_at < last:
+                        self.log_test("Changes Paging", False, f"Changes out of order at {key}")
                         return False
-                
-                # Check for expected skill categories
-                categories = [s['category'].lower() for s in data]
-                expected_categories = ['programming', 'frameworks', 'tools']
-                
-                found_categories = []
-                for expected in expected_categories:
-                    for category in categories:
-                        if expected in category:
-                            found_categories.append(expected)
-                            break
-                
-                if len(found_categories) < 2:  # At least 2 expected categories should be found
-                    self.log_test("Skills", False, f"Expected skill categories not found. Found: {found_categories}")
+                    seen.add(key)
+                    last = updated_at
+                if not data['next_token']:
+                    self.log_test("Changes Paging", False, "Page without next_token")
                     return False
-                
-                self.log_test("Skills", True, f"Found {len(data)} skill categories including: {found_categories}")
-                return True
-                
+                token = data['next_token']
+                if not data['has_more']:
+                    break
             else:
-                self.log_test("Skills", False, f"HTTP {response.status_code}: {response.text}")
+                self.log_test("Changes Paging", False, "Paging did not terminate")
                 return False
-                
+
+            collections = {collection for collection, _, _ in seen}
+            if not {'profiles', 'projects'} <= collections:
+                self.log_test("Changes Paging", False, f"Expected profile and project changes, got {sorted(collections)}")
+                return False
+
+            response = self.session.get(f"{self.base_url}/api/portfolio/changes", params={'token': token}, timeout=10)
+            if response.status_code != 200 or response.json()['changes']:
+                self.log_test("Changes Paging", False, f"Final token should return no changes: HTTP {response.status_code} {response.text}")
+                return False
+
+            response = self.session.get(f"{self.base_url}/api/portfolio/changes", params={'token': 'not-a-token'}, timeout=10)
+            if response.status_code != 400:
+                self.log_test("Changes Paging", False, f"Invalid token: expected 400, got {response.status_code}")
+                return False
+
+            self.log_test("Changes Paging", True, f"{len(seen)} changes over {page + 1} pages from {sorted(collections)}")
+            return True
         except Exception as e:
-            self.log_test("Skills", False, f"Request failed: {str(e)}")
+            self.log_test("Changes Paging", False, f"Request failed: {str(e)}")
             return False
-    
-    def test_achievements(self):
-        """Test GET /api/portfolio/achievements endpoint"""
+
+    def test_write_status(self):
+        """Test GET /api/portfolio/writes/{id} for a persisted project and an unknown id"""
         try:
-            response = self.session.get(f"{self.base_url}/api/portfolio/achievements", timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if not isinstance(data, list):
-                    self.log_test("Achievements", False, "Response is not a list")
-                    return False
-                
-                if len(data) == 0:
-                    self.log_test("Achievements", False, "No achievements found")
-                    return False
-                
-                # Validate achievement structure
-                for i, achievement in enumerate(data):
-                    required_fields = ['id', 'title', 'description', 'created_at', 'updated_at']
-                    missing_fields = [field for field in required_fields if field not in achievement]
-                    
-                    if missing_fields:
-                        self.log_test("Achievements", False, f"Achievement {i} missing fields: {missing_fields}")
-                        return False
-                
-                # Check for expected achievements
-                achievement_titles = [a['title'].lower() for a in data]
-                expected_achievements = ['champion', 'snowflake', 'integration']
-                
-                found_achievements = []
-                for expected in expected_achievements:
-                    for title in achievement_titles:
-                        if expected in title:
-                            found_achievements.append(expected)
-                            break
-                
-                if len(found_achievements) < 2:  # At least 2 expected achievements should be found
-                    self.log_test("Achievements", False, f"Expected achievements not found. Found: {found_achievements}")
-                    return False
-                
-                self.log_test("Achievements", True, f"Found {len(data)} achievements including: {found_achievements}")
-                return True
-                
-            else:
-                self.log_test("Achievements", False, f"HTTP {response.status_code}: {response.text}")
+            response = self.session.get(f"{self.base_url}/api/portfolio/projects", timeout=10)
+            project_id = response.json()[0]['id']
+            response = self.session.get(f"{self.base_url}/api/portfolio/writes/{project_id}", timeout=10)
+            if response.status_code != 200 or response.json().get('status') != 'persisted':
+                self.log_test("Write Status", False, f"Existing project: HTTP {response.status_code} {response.text}")
                 return False
-                
+            response = self.session.get(f"{self.base_url}/api/portfolio/writes/no-such-id", timeout=10)
+            if response.status_code != 404:
+                self.log_test("Write Status", False, f"Unknown id: expected 404, got {response.status_code}")
+                return False
+            self.log_test("Write Status", True, f"Project {project_id} reported persisted, unknown id 404")
+            return True
         except Exception as e:
-            self.log_test("Achievements", False, f"Request failed: {str(e)}")
+            self.log_test("Write Status", False, f"Request failed: {str(e)}")
             return False
-    
-    def test_certifications(self):
-        """Test GET /api/portfolio/certifications endpoint"""
+
+    def test_health_probes(self):
+        """Test GET /api/health/live and /api/health/ready"""
         try:
-            response = self.session.get(f"{self.base_url}/api/portfolio/certifications", timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                if not isinstance(data, list):
-                    self.log_test("Certifications", False, "Response is not a list")
-                    return False
-                
-                if len(data) == 0:
-                    self.log_test("Certifications", False, "No certifications found")
-                    return False
-                
-                # Validate certification structure
-                for i, certification in enumerate(data):
-                    required_fields = ['id', 'name', 'issuer', 'created_at', 'updated_at']
-                    missing_fields = [field for field in required_fields if field not in certification]
-                    
-                    if missing_fields:
-                        self.log_test("Certifications", False, f"Certification {i} missing fields: {missing_fields}")
-                        return False
-                
-                # Check for expected certifications
-                cert_names = [c['name'].lower() for c in data]
-                expected_certs = ['ui design', 'sql', 'cybersecurity']
-                
-                found_certs = []
-                for expected in expected_certs:
-                    for name in cert_names:
-                        if expected in name:
-                            found_certs.append(expected)
-                            break
-                
-                if len(found_certs) < 2:  # At least 2 expected certifications should be found
-                    self.log_test("Certifications", False, f"Expected certifications not found. Found: {found_certs}")
-                    return False
-                
-                self.log_test("Certifications", True, f"Found {len(data)} certifications including: {found_certs}")
-                return True
-                
-            else:
-                self.log_test("Certifications", False, f"HTTP {response.status_code}: {response.text}")
+            live = self.session.get(f"{self.base_url}/api/health/live", timeout=10)
+            ready = self.session.get(f"{self.base_url}/api/health/ready", timeout=10)
+            if live.status_code != 200 or live.json().get('status') != 'alive':
+                self.log_test("Health Probes", False, f"Liveness: HTTP {live.status_code} {live.text}")
                 return False
-                
+            if ready.status_code != 200 or ready.json().get('status') != 'ready':
+                self.log_test("Health Probes", False, f"Readiness: HTTP {ready.status_code} {ready.text}")
+                return False
+            details = ready.json()
+            self.log_test("Health Probes", True, f"Live; ready with mongo rtt {details['mongo']['rtt_ms']} ms, loop lag {details['event_loop_lag_ms']} ms")
+            return True
         except Exception as e:
-            self.log_test("Certifications", False, f"Request failed: {str(e)}")
+            self.log_test("Health Probes", False, f"Request failed: {str(e)}")
             return False
-    
+
     def test_error_handling(self):
         """Test error handling for invalid requests"""
         try:
@@ -362,6 +395,10 @@ class PortfolioAPITester:
             self.test_skills,
             self.test_achievements,
             self.test_certifications,
+            self.test_portfolio_view,
+            self.test_changes_paging,
+            self.test_write_status,
+            self.test_health_probes,
             self.test_error_handling
         ]
         
@@ -398,13 +435,209 @@ class PortfolioAPITester:
         except Exception as e:
             print(f"❌ Failed to save results: {e}")
 
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def latency_summary(latencies):
+    """p50/p95/p99/max in milliseconds"""
+    values = sorted(latencies)
+    return {
+        'p50_ms': round(percentile(values, 50) * 1000, 2),
+        'p95_ms': round(percentile(values, 95) * 1000, 2),
+        'p99_ms': round(percentile(values, 99) * 1000, 2),
+        'max_ms': round(values[-1] * 1000, 2) if values else 0.0
+    }
+
+def read_rss_mb(pid):
+    """Resident set size of a local process in MB, or None if it cannot be read"""
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+class PortfolioStressTester(PortfolioAPITester):
+    """Runs the endpoint checks from many concurrent async clients.
+
+    Every response is validated with the same validators as the sequential
+    tests. Error rate, latency percentiles and (given the server pid) server
+    RSS are recorded per interval window, and the summary is saved in the
+    same format as the sequential results.
+    """
+    
+    def __init__(self, base_url, concurrency=50, duration=60, max_requests=None, interval=5,
+                 server_pid=None, max_error_rate=0.01, max_rss_growth_mb=50):
+        super().__init__(base_url)
+        self.concurrency = concurrency
+        self.duration = duration
+        self.max_requests = max_requests
+        self.interval = interval
+        self.server_pid = server_pid
+        self.max_error_rate = max_error_rate
+        self.max_rss_growth_mb = max_rss_growth_mb
+        self.issued = 0
+        self.window = []
+        self.endpoint_stats = {name: {'latencies': [], 'errors': 0, 'first_error': None} for name, _, _ in ENDPOINT_CHECKS}
+        self.rss_samples = []
+    
+    def _done(self, deadline):
+        if self.max_requests is not None and self.issued >= self.max_requests:
+            return True
+        return self.max_requests is None and time.monotonic() >= deadline
+    
+    async def _worker(self, client, deadline):
+        while not self._done(deadline):
+            name, path, validator = ENDPOINT_CHECKS[self.issued % len(ENDPOINT_CHECKS)]
+            self.issued += 1
+            
+            started = time.perf_counter()
+            try:
+                response = await client.get(f"{self.base_url}{path}")
+                latency = time.perf_counter() - started
+                if response.status_code == 200:
+                    success, details = validator(response.json())
+                else:
+                    success, details = False, f"HTTP {response.status_code}: {response.text[:200]}"
+            except Exception as e:
+                latency = time.perf_counter() - started
+                success, details = False, f"Request failed: {str(e)}"
+            
+            stats = self.endpoint_stats[name]
+            stats['latencies'].append(latency)
+            if not success:
+                stats['errors'] += 1
+                stats['first_error'] = stats['first_error'] or details
+            self.window.append((latency, success))
+    
+    def _close_window(self, index, elapsed):
+        """Log one interval window: throughput, error rate, latency and RSS"""
+        window, self.window = self.window, []
+        rss = read_rss_mb(self.server_pid) if self.server_pid else None
+        if rss is not None:
+            self.rss_samples.append(rss)
+        
+        errors = sum(1 for _, success in window if not success)
+        error_rate = errors / len(window) if window else 0.0
+        metrics = {
+            'elapsed_s': round(elapsed, 1),
+            'requests': len(window),
+            'error_rate': round(error_rate, 4),
+            **latency_summary([latency for latency, _ in window]),
+            'rss_mb': round(rss, 1) if rss is not None else None
+        }
+        details = (f"t={metrics['elapsed_s']}s: {metrics['requests']} requests, errors {error_rate:.2%}, "
+                   f"p50 {metrics['p50_ms']} ms, p95 {metrics['p95_ms']} ms, p99 {metrics['p99_ms']} ms")
+        if rss is not None:
+            details += f", RSS {metrics['rss_mb']} MB"
+        self.log_test(f"Stress Window {index}", error_rate <= self.max_error_rate, details)
+        self.test_results[-1]['metrics'] = metrics
+    
+    async def _sample_windows(self, started, workers):
+        index = 1
+        while not all(worker.done() for worker in workers):
+            await asyncio.wait(workers, timeout=self.interval)
+            self._close_window(index, time.monotonic() - started)
+            index += 1
+    
+    async def run(self):
+        import httpx
+        
+        started = time.monotonic()
+        deadline = started + self.duration
+        if self.server_pid:
+            baseline = read_rss_mb(self.server_pid)
+            if baseline is not None:
+                self.rss_samples.append(baseline)
+        
+        clients = [httpx.AsyncClient(timeout=10) for _ in range(self.concurrency)]
+        try:
+            workers = [asyncio.create_task(self._worker(client, deadline)) for client in clients]
+            await self._sample_windows(started, workers)
+        finally:
+            await asyncio.gather(*(client.aclose() for client in clients))
+        return time.monotonic() - started
+    
+    def run_all_tests(self):
+        """Run the stress test and log per-endpoint and RSS summaries"""
+        limit = f"{self.max_requests} requests" if self.max_requests is not None else f"{self.duration}s"
+        print(f"🚀 Starting Portfolio Backend Stress Test ({self.concurrency} clients, {limit})")
+        print("=" * 50)
+        
+        elapsed = asyncio.run(self.run())
+        print()
+        
+        for name, stats in self.endpoint_stats.items():
+            requests_made = len(stats['latencies'])
+            error_rate = stats['errors'] / requests_made if requests_made else 0.0
+            metrics = {
+                'requests': requests_made,
+                'errors': stats['errors'],
+                'error_rate': round(error_rate, 4),
+                'throughput_rps': round(requests_made / elapsed, 1) if elapsed else 0.0,
+                **latency_summary(stats['latencies'])
+            }
+            details = (f"{requests_made} requests, errors {error_rate:.2%}, p50 {metrics['p50_ms']} ms, "
+                       f"p95 {metrics['p95_ms']} ms, p99 {metrics['p99_ms']} ms")
+            if stats['first_error']:
+                details += f", first error: {stats['first_error']}"
+            self.log_test(f"Stress - {name}", requests_made > 0 and error_rate <= self.max_error_rate, details)
+            self.test_results[-1]['metrics'] = metrics
+        
+        if len(self.rss_samples) >= 2:
+            growth = self.rss_samples[-1] - self.rss_samples[0]
+            self.log_test("Stress - Server RSS", growth <= self.max_rss_growth_mb,
+                          f"RSS {self.rss_samples[0]:.1f} MB -> {self.rss_samples[-1]:.1f} MB "
+                          f"(growth {growth:.1f} MB, limit {self.max_rss_growth_mb} MB)")
+            self.test_results[-1]['metrics'] = {'rss_mb': [round(rss, 1) for rss in self.rss_samples]}
+        
+        passed = sum(1 for r in self.test_results if r['success'])
+        total = len(self.test_results)
+        print("=" * 50)
+        print(f"📊 Stress Results: {passed}/{total} checks passed")
+        return passed == total
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Portfolio backend API tests")
+    parser.add_argument('--stress', action='store_true', help="run the concurrent soak/stress mode")
+    parser.add_argument('--concurrency', type=int, default=50, help="number of concurrent async clients")
+    parser.add_argument('--duration', type=float, default=60, help="stress duration in seconds")
+    parser.add_argument('--requests', type=int, default=None, help="stop after this many requests instead of --duration")
+    parser.add_argument('--interval', type=float, default=5, help="seconds per reporting window")
+    parser.add_argument('--server-pid', type=int, default=None, help="local server pid to watch RSS growth")
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--max-rss-growth-mb', type=float, default=50)
+    parser.add_argument('--output', default=None, help="results file")
+    return parser.parse_args()
+
 def main():
     """Main test execution"""
-    tester = PortfolioAPITester(BACKEND_URL)
+    args = parse_args()
+    if args.stress:
+        tester = PortfolioStressTester(
+            BACKEND_URL,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            max_requests=args.requests,
+            interval=args.interval,
+            server_pid=args.server_pid,
+            max_error_rate=args.max_error_rate,
+            max_rss_growth_mb=args.max_rss_growth_mb
+        )
+        output = args.output or "/app/backend_stress_results.json"
+    else:
+        tester = PortfolioAPITester(BACKEND_URL)
+        output = args.output or "/app/backend_test_results.json"
     
     try:
         success = tester.run_all_tests()
-        tester.save_results("/app/backend_test_results.json")
+        tester.save_results(output)
         
         if success:
             print("\n✅ All backend APIs are working correctly!")
@@ -0,0 +1,35 @@
+"""Backend tests run against an in-memory mongomock-motor client instead of a MongoDB server."""
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ["LKG_SNAPSHOT_PATH"] = str(Path(tempfile.mkdtemp()) / "lkg_snapshot.json")
+
+import motor.motor_asyncio  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+motor.motor_asyncio.AsyncIOMotorClient = lambda *args, **kwargs: AsyncMongoMockClient()
+
+import pytest  # noqa: E402
+
+import database  # noqa: E402
+from resilience import CLOSED, db_breaker, last_known_good  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    """Empty database, closed breaker and no last-known-good data for every test"""
+    async def drop_collections():
+        for name in await database.db.list_collection_names():
+            await database.db.drop_collection(name)
+
+    asyncio.run(drop_collections())
+    db_breaker.state = CLOSED
+    db_breaker.failures = 0
+    db_breaker.opened_at = None
+    last_known_good._entries.clear()
+    last_known_good._save_task = None
+    yield
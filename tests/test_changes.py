@@ -0,0 +1,77 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import changes
+import portfolio_routes
+from changes import check_retention, decode_token, delete_with_tombstones, load_changes
+from database import projects_collection, skills_collection
+from resilience import CLOSED, db_breaker
+
+
+def document(document_id, updated_at, owner="o"):
+    return {"id": document_id, "owner": owner, "title": document_id, "created_at": updated_at, "updated_at": updated_at}
+
+
+def sync(owner="o", token=None, limit=2):
+    """Page through all changes after token the way a client does; returns (changes, final token)"""
+    async def pages():
+        position = decode_token(token) if token else None
+        seen = []
+        while True:
+            check_retention(position)
+            page, next_token, has_more = await load_changes(owner, position, limit)
+            seen += page
+            position = decode_token(next_token)
+            if not has_more:
+                return seen, next_token
+
+    return asyncio.run(pages())
+
+
+def test_token_moves_past_writes_older_than_retention():
+    asyncio.run(projects_collection.insert_one(document("p1", datetime.utcnow() - timedelta(days=31))))
+
+    synced, token = sync()
+    assert [change["id"] for change in synced] == ["p1"]
+
+    # Polling with the returned token must neither fail nor repeat the old change
+    synced, token = sync(token=token)
+    assert synced == []
+    check_retention(decode_token(token))
+
+
+def test_paging_returns_each_change_once_in_order():
+    tied = datetime.utcnow() - timedelta(minutes=5)
+    later = tied + timedelta(minutes=1)
+    asyncio.run(projects_collection.insert_many([document(f"p{i}", tied) for i in range(5)] + [document("p9", later)]))
+    asyncio.run(skills_collection.insert_many([document(f"s{i}", tied) for i in range(3)]))
+    asyncio.run(projects_collection.insert_one(document("other", tied, owner="someone-else")))
+
+    synced, _ = sync(limit=2)
+    ids = [change["id"] for change in synced]
+    assert sorted(ids) == sorted([f"p{i}" for i in range(5)] + ["p9"] + [f"s{i}" for i in range(3)])
+    assert len(ids) == len(set(ids))
+    assert [change["updated_at"] for change in synced] == sorted(change["updated_at"] for change in synced)
+
+
+def test_deletes_are_synced_as_tombstones(monkeypatch):
+    monkeypatch.setattr(changes, "SETTLE_WINDOW", timedelta(0))
+    asyncio.run(projects_collection.insert_one(document("p1", datetime.utcnow() - timedelta(minutes=1))))
+    _, token = sync()
+    time.sleep(0.01)
+
+    asyncio.run(delete_with_tombstones(projects_collection, {"id": "p1"}))
+    synced, _ = sync(token=token)
+    assert [(change["collection"], change["op"], change["id"]) for change in synced] == [("projects", "delete", "p1")]
+
+
+def test_expired_position_is_410_and_does_not_trip_the_breaker():
+    for _ in range(db_breaker.failure_threshold + 1):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(portfolio_routes.get_changes(owner="o", since=datetime(2000, 1, 1), token=None, limit=500))
+        assert error.value.status_code == 410
+    assert db_breaker.state == CLOSED
@@ -0,0 +1,85 @@
+import asyncio
+import signal
+
+import uvicorn
+
+import server
+from health import DRAINING, READY, STARTING, DependencyProbe, DrainingServer
+
+
+def test_warm_up_retries_until_the_database_answers(monkeypatch):
+    attempts = 0
+
+    async def flaky_seed():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise ConnectionError("mongo not up yet")
+
+    monkeypatch.setattr(server, "seed_database", flaky_seed)
+    monkeypatch.setattr(server.dependency_probe, "lifecycle", STARTING)
+
+    asyncio.run(server.warm_up(asyncio.Event(), backoff=0.01))
+
+    assert attempts == 3
+    assert server.dependency_probe.lifecycle == READY
+
+
+def test_warm_up_stops_retrying_once_draining(monkeypatch):
+    async def failing_seed():
+        raise ConnectionError("mongo down")
+
+    async def scenario():
+        stopping = asyncio.Event()
+        task = asyncio.create_task(server.warm_up(stopping, backoff=60))
+        await asyncio.sleep(0.01)
+        server.dependency_probe.lifecycle = DRAINING
+        stopping.set()
+        await asyncio.wait_for(task, 1)
+
+    monkeypatch.setattr(server, "seed_database", failing_seed)
+    monkeypatch.setattr(server.dependency_probe, "lifecycle", STARTING)
+    asyncio.run(scenario())
+
+    assert server.dependency_probe.lifecycle == DRAINING
+
+
+def draining_server(drain_delay):
+    probe = DependencyProbe(drain_delay=drain_delay)
+    probe.lifecycle = READY
+    return DrainingServer(uvicorn.Config(server.app), probe)
+
+
+def test_sigterm_drains_before_the_server_exits():
+    drainer = draining_server(0.05)
+
+    async def scenario():
+        drainer._loop = asyncio.get_running_loop()
+        drainer.handle_exit(signal.SIGTERM, None)
+        await asyncio.sleep(0.01)
+        assert drainer.probe.lifecycle == DRAINING
+        assert not drainer.should_exit
+        await asyncio.sleep(0.1)
+        assert drainer.should_exit
+
+    asyncio.run(scenario())
+
+
+def test_second_sigterm_exits_immediately():
+    drainer = draining_server(60)
+
+    async def scenario():
+        drainer._loop = asyncio.get_running_loop()
+        drainer.handle_exit(signal.SIGTERM, None)
+        drainer.handle_exit(signal.SIGTERM, None)
+        assert drainer.should_exit
+
+    asyncio.run(scenario())
+
+
+def test_no_drain_window_when_disabled():
+    drainer = draining_server(0)
+    drainer.handle_exit(signal.SIGTERM, None)
+
+    assert drainer.should_exit
+    assert drainer.probe.lifecycle == READY
@@ -0,0 +1,20 @@
+import asyncio
+
+from indexes import INDEX_SPECS, OWNER_ID_INDEX, covers, existing_indexes, reconcile_indexes, uncovered_query_shapes
+
+
+def test_every_route_query_shape_is_served_by_a_declared_index():
+    assert uncovered_query_shapes(INDEX_SPECS) == []
+
+
+def test_write_status_lookup_needs_the_owner_id_index():
+    shape = {"filter": ["owner", "id"], "sort": []}
+
+    assert covers(OWNER_ID_INDEX, shape)
+    assert not any(covers(keys, shape) for keys in INDEX_SPECS["tombstones"])
+
+
+def test_reconcile_creates_missing_indexes():
+    asyncio.run(reconcile_indexes())
+
+    assert OWNER_ID_INDEX in asyncio.run(existing_indexes("projects")).values()
@@ -0,0 +1,31 @@
+import asyncio
+import logging
+
+from logging_config import AccessLogMiddleware
+
+
+def request(status, sample_rate=0.0):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    middleware = AccessLogMiddleware(app, sample_rate=sample_rate)
+    asyncio.run(middleware({"type": "http", "method": "GET", "path": "/api/x"}, None, send))
+
+
+def test_error_responses_are_logged_regardless_of_sample_rate(caplog):
+    caplog.set_level(logging.INFO, logger="access")
+    for status in (200, 404, 503):
+        request(status)
+
+    assert [(record.status, record.levelno) for record in caplog.records] == [(404, logging.WARNING), (503, logging.ERROR)]
+
+
+def test_successful_responses_are_sampled(caplog):
+    caplog.set_level(logging.INFO, logger="access")
+    request(200, sample_rate=1.0)
+
+    assert [(record.status, record.levelno) for record in caplog.records] == [(200, logging.INFO)]
@@ -0,0 +1,56 @@
+import asyncio
+import json
+from datetime import datetime
+
+import portfolio_snapshot
+from portfolio_snapshot import PortfolioSnapshot, SnapshotStore
+
+
+def view(owner, version=1, technologies=("Java", "Kotlin")):
+    return {
+        "owner": owner, "version": version, "profile": None, "skills": [], "achievements": [], "certifications": [],
+        "projects": [{
+            "id": f"{owner}-p1", "owner": owner, "title": "t", "description": "d", "highlights": ["h"],
+            # Decoded separately per owner, like documents read from Mongo
+            "technologies": [technology.encode().decode() for technology in technologies],
+            "created_at": datetime(2024, 1, 1), "updated_at": datetime(2024, 1, 1),
+        }],
+    }
+
+
+def test_vocabulary_is_shared_across_snapshots():
+    first, second = PortfolioSnapshot(view("a")), PortfolioSnapshot(view("b"))
+
+    assert first.sections["projects"][0].technologies[0] is second.sections["projects"][0].technologies[0]
+    assert json.loads(first.section_json("projects"))[0]["technologies"] == ["Java", "Kotlin"]
+
+
+def test_replace_only_discards_builds_of_the_same_owner(monkeypatch):
+    store = SnapshotStore(enabled=True)
+    versions = {"a": 1, "b": 1}
+    gates = {}
+
+    async def slow_get_view(owner):
+        version = versions[owner]
+        await gates[owner].wait()
+        return view(owner, version)
+
+    async def scenario():
+        gates["a"], gates["b"] = asyncio.Event(), asyncio.Event()
+        a_build = asyncio.create_task(store.get("a"))
+        stale_b_build = asyncio.create_task(store.get("b"))
+        await asyncio.sleep(0)
+
+        # A write for b lands while both builds are in flight
+        versions["b"] = 2
+        b_replace = asyncio.create_task(store.replace("b"))
+        await asyncio.sleep(0)
+        gates["a"].set()
+        gates["b"].set()
+        await asyncio.gather(a_build, stale_b_build, b_replace)
+
+    monkeypatch.setattr(portfolio_snapshot, "get_view", slow_get_view)
+    asyncio.run(scenario())
+
+    assert store.held("a").version == 1
+    assert store.held("b").version == 2
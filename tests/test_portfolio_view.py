@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import portfolio_view
+from database import portfolio_views_collection, profiles_collection, projects_collection
+from portfolio_view import VIEW_SECTION_LIMIT, apply_inserts, build_view, check_view_consistency, get_view
+
+
+def project(index, owner="o"):
+    return {"id": f"p{index}", "owner": owner, "title": f"p{index}",
+            "created_at": datetime(2024, 1, 1) + timedelta(minutes=index)}
+
+
+def test_unknown_owner_gets_an_empty_view_that_is_not_stored():
+    view = asyncio.run(get_view("nobody"))
+
+    assert view["version"] == 0 and view["projects"] == [] and view["profile"] is None
+    assert asyncio.run(portfolio_views_collection.count_documents({})) == 0
+
+
+def test_inserts_keep_sections_sorted_and_capped():
+    asyncio.run(projects_collection.insert_many([project(i) for i in range(VIEW_SECTION_LIMIT)]))
+    built = asyncio.run(build_view("o"))
+    assert len(built["projects"]) == VIEW_SECTION_LIMIT
+
+    newest = project(VIEW_SECTION_LIMIT)
+    asyncio.run(projects_collection.insert_one(dict(newest)))
+    asyncio.run(apply_inserts(projects_collection, [newest]))
+
+    view = asyncio.run(get_view("o"))
+    assert view["version"] == built["version"] + 1
+    assert len(view["projects"]) == VIEW_SECTION_LIMIT
+    assert view["projects"][0]["id"] == newest["id"]
+    assert "p0" not in {document["id"] for document in view["projects"]}
+    assert asyncio.run(check_view_consistency("o"))["consistent"]
+
+
+def test_rebuild_retries_when_the_version_moves(monkeypatch):
+    asyncio.run(profiles_collection.insert_one({"id": "profile", "owner": "o", "name": "Before"}))
+    asyncio.run(build_view("o"))
+    load_sources = portfolio_view.load_sources
+    calls = 0
+
+    async def racing_load_sources(owner):
+        # An insert is patched into the view while the first rebuild is reading its sources
+        nonlocal calls
+        calls += 1
+        sources = await load_sources(owner)
+        if calls == 1:
+            newest = project(1)
+            await projects_collection.insert_one(dict(newest))
+            await apply_inserts(projects_collection, [newest])
+        return sources
+
+    monkeypatch.setattr(portfolio_view, "load_sources", racing_load_sources)
+    view = asyncio.run(build_view("o"))
+
+    assert calls == 2
+    assert [document["id"] for document in view["projects"]] == ["p1"]
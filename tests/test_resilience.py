@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException, Response
+from pymongo.errors import AutoReconnect
+
+import portfolio_routes
+from database import projects_collection
+from models import Project
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, db_breaker, last_known_good
+
+
+def call(breaker, operation):
+    return asyncio.run(breaker.call(operation))
+
+
+async def unreachable():
+    raise AutoReconnect("connection refused")
+
+
+def test_breaker_opens_after_consecutive_database_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(3):
+        with pytest.raises(AutoReconnect):
+            call(breaker, unreachable)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        call(breaker, unreachable)
+
+
+def test_deadline_misses_count_as_failures():
+    breaker = CircuitBreaker(failure_threshold=1, call_timeout=0.01)
+
+    with pytest.raises(asyncio.TimeoutError):
+        call(breaker, lambda: asyncio.sleep(1))
+    assert breaker.state == OPEN
+
+
+def test_other_errors_do_not_count():
+    breaker = CircuitBreaker(failure_threshold=1)
+
+    async def broken():
+        raise ValueError("bad document")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            call(breaker, broken)
+    assert breaker.state == CLOSED and breaker.failures == 0
+
+
+def test_half_open_trial_closes_or_reopens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    with pytest.raises(AutoReconnect):
+        call(breaker, unreachable)
+    time.sleep(0.02)
+
+    with pytest.raises(AutoReconnect):
+        call(breaker, unreachable)
+    assert breaker.state == OPEN
+
+    time.sleep(0.02)
+    assert call(breaker, lambda: asyncio.sleep(0, "ok")) == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_non_database_error_in_trial_leaves_breaker_half_open():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    with pytest.raises(AutoReconnect):
+        call(breaker, unreachable)
+    time.sleep(0.02)
+
+    async def broken():
+        raise ValueError("bad document")
+
+    with pytest.raises(ValueError):
+        call(breaker, broken)
+    assert breaker.state == HALF_OPEN
+    assert call(breaker, lambda: asyncio.sleep(0, "ok")) == "ok"
+    assert breaker.state == CLOSED
+
+
+def get_projects(owner="o"):
+    response = Response()
+    projects = asyncio.run(portfolio_routes.get_projects(response, owner=owner))
+    return projects, response
+
+
+def open_breaker():
+    db_breaker.state = OPEN
+    db_breaker.opened_at = time.monotonic()
+
+
+def test_open_breaker_serves_last_known_good_with_stale_headers():
+    project = Project(owner="o", title="t", description="d", highlights=[], technologies=["python"])
+    asyncio.run(projects_collection.insert_one(project.model_dump()))
+    fresh, response = get_projects()
+    assert "X-Data-Stale" not in response.headers
+
+    open_breaker()
+    stale, response = get_projects()
+
+    assert [p.id for p in stale] == [p.id for p in fresh] == [project.id]
+    assert response.headers["X-Data-Stale"] == "true"
+    assert "Age" in response.headers
+
+
+def test_open_breaker_without_last_known_good_is_503():
+    open_breaker()
+
+    with pytest.raises(HTTPException) as error:
+        get_projects()
+    assert error.value.status_code == 503
+
+
+def test_empty_results_are_not_kept_as_last_known_good():
+    projects, _ = get_projects("nobody")
+
+    assert projects == []
+    assert len(last_known_good) == 0
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+from database import projects_collection
+from write_behind import FAILED, PERSISTED, QUEUED, WriteBehindQueue, WriteQueueFullError
+
+
+class FlakyCollection:
+    """Wraps a collection so the first ``failures`` insert_many calls raise after inserting ``partial`` documents"""
+
+    def __init__(self, collection, failures, partial=0):
+        self.collection = collection
+        self.name = collection.name
+        self.failures = failures
+        self.partial = partial
+        self.attempts = []
+
+    async def insert_many(self, documents, ordered=True):
+        self.attempts.append([dict(document) for document in documents])
+        if len(self.attempts) <= self.failures:
+            if self.partial:
+                await self.collection.insert_many([dict(document) for document in documents[:self.partial]])
+            raise AutoReconnect("connection reset")
+        await self.collection.insert_many(documents, ordered=ordered)
+
+    def find(self, *args, **kwargs):
+        return self.collection.find(*args, **kwargs)
+
+
+def project(document_id):
+    return {"id": document_id, "owner": "o", "title": document_id}
+
+
+def run(queue, coroutine):
+    async def scenario():
+        await queue.start()
+        try:
+            return await coroutine()
+        finally:
+            await queue.stop()
+
+    return asyncio.run(scenario())
+
+
+def test_transient_failure_is_retried_without_duplicates_and_restamped():
+    queue = WriteBehindQueue(enabled=True, flush_interval=0.01, retry_backoff=0.01)
+    collection = FlakyCollection(projects_collection, failures=1, partial=1)
+
+    async def scenario():
+        for document_id in ("p1", "p2", "p3"):
+            await queue.enqueue(collection, project(document_id))
+
+    run(queue, scenario)
+
+    stored = asyncio.run(projects_collection.find({}, {"_id": 0, "id": 1}).to_list(None))
+    assert sorted(document["id"] for document in stored) == ["p1", "p2", "p3"]
+    first, retry = collection.attempts
+    assert [document["id"] for document in retry] == ["p2", "p3"]
+    assert retry[0]["updated_at"] > first[0]["updated_at"]
+    assert all(queue._status[document_id] == PERSISTED for document_id in ("p1", "p2", "p3"))
+
+
+def test_documents_fail_after_max_retries():
+    queue = WriteBehindQueue(enabled=True, flush_interval=0.01, max_retries=2, retry_backoff=0.01)
+    collection = FlakyCollection(projects_collection, failures=10)
+
+    async def scenario():
+        await queue.enqueue(collection, project("p1"))
+
+    run(queue, scenario)
+
+    assert len(collection.attempts) == 3
+    assert queue._status["p1"] == FAILED
+    assert asyncio.run(projects_collection.count_documents({})) == 0
+
+
+def test_full_queue_rejects_after_enqueue_timeout():
+    queue = WriteBehindQueue(enabled=True, max_pending=1, batch_size=1, flush_interval=0.01, enqueue_timeout=0.05)
+    released = None
+
+    class BlockedCollection(FlakyCollection):
+        async def insert_many(self, documents, ordered=True):
+            await released.wait()
+            await super().insert_many(documents, ordered)
+
+    collection = BlockedCollection(projects_collection, failures=0)
+
+    async def scenario():
+        nonlocal released
+        released = asyncio.Event()
+        await queue.enqueue(collection, project("p1"))  # taken by the flush, which blocks
+        await asyncio.sleep(0.02)
+        await queue.enqueue(collection, project("p2"))  # fills the queue
+        with pytest.raises(WriteQueueFullError):
+            await queue.enqueue(collection, project("p3"))
+        assert "p3" not in queue._status
+        assert queue._status["p2"] == QUEUED
+        released.set()
+
+    run(queue, scenario)
+
+    assert queue._status["p1"] == queue._status["p2"] == PERSISTED
+
+
+def test_status_falls_back_to_the_collection():
+    queue = WriteBehindQueue()
+    asyncio.run(projects_collection.insert_one(project("p1")))
+
+    assert asyncio.run(queue.status("p1", [projects_collection], {"owner": "o"})) == PERSISTED
+    assert asyncio.run(queue.status("p1", [projects_collection], {"owner": "other"})) is None
+    assert asyncio.run(queue.status("missing", [projects_collection])) is None
+
+
+def test_stop_flushes_queued_documents():
+    queue = WriteBehindQueue(enabled=True, batch_size=100, flush_interval=10)
+
+    async def scenario():
+        for document_id in ("p1", "p2"):
+            await queue.enqueue(projects_collection, project(document_id))
+
+    run(queue, scenario)
+
+    assert asyncio.run(projects_collection.count_documents({})) == 2